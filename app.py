@@ -9,14 +9,36 @@ from user.routes import user
 from platforms import shopify
 from dotenv import load_dotenv
 import asyncmy
+import aiohttp
 from datetime import timedelta
 from quart_mongo import Mongo
+from utils.json_provider import OrjsonProvider
 import asyncio
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
 
 
 load_dotenv()  # Load environment variables from .env file
 
+# log records are only queued on the request path, a listener thread does the actual writing
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+log_handlers = [log_handler]
+if os.environ.get('HOOTER_LOG_FILE'):
+    # file writes stay on the listener thread as well, never on the request path
+    log_file_handler = logging.FileHandler(os.environ.get('HOOTER_LOG_FILE'))
+    log_file_handler.setFormatter(log_handler.formatter)
+    log_handlers.append(log_file_handler)
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+logging.basicConfig(level=os.environ.get('HOOTER_LOG_LEVEL', 'INFO'), handlers=[QueueHandler(log_queue)])
+log_listener.start()
+atexit.register(log_listener.stop)
+
 app = Quart(__name__)
+app.json = OrjsonProvider(app)  # jsonify and request json parsing go through orjson
 cors(app, allow_credentials=True,
     allow_origin=['http://192.168.1.26:5173', 'http://127.0.0.1:5173', 'http://localhost:5173', 
                   'https://workspace.h0oter.com', 
@@ -70,25 +92,45 @@ async def sql_connection_startup():
                 user = os.environ.get('HOOTER_DB_USER'),
                 password = os.environ.get('HOOTER_DB_PASSWORD'),
                 db = os.environ.get('HOOTER_DB'),
-                minsize = 1,
-                maxsize = 20,
+                # keep a few connections warm so requests skip the tcp + auth handshake
+                # maxsize is per worker process, requests beyond it wait in pool.acquire()
+                minsize = int(os.environ.get('HOOTER_DB_POOL_MIN', '5')),
+                maxsize = int(os.environ.get('HOOTER_DB_POOL_MAX', '20')),
+                # replace idle connections before the server's wait_timeout drops them
+                pool_recycle = int(os.environ.get('HOOTER_DB_POOL_RECYCLE', '1800')),
+                charset = 'utf8mb4',
+                # single statement reads commit on their own, multi statement writes call connection.begin()
                 autocommit=True
-                # pool_recycle=3600
             )
             connection = True
         except Exception as e:
             connection = False
             count += 1
-            print(e)
+            logging.getLogger(__name__).warning('could not create the sql connection pool (attempt %s): %s', count, e)
             await asyncio.sleep(2)
 
+    # refuse to serve instead of failing every request later on a missing pool
+    if not connection:
+        raise RuntimeError('unable to create the sql connection pool')
+
 
 @app.after_serving
-async def sql_connection_shutdown(response):
+async def sql_connection_shutdown():
     app.pool.close()
     await app.pool.wait_closed()
 
 
+# one outbound http session per worker, keep-alive connections are reused across requests
+@app.before_serving
+async def http_session_startup():
+    app.http_session = aiohttp.ClientSession()
+
+
+@app.after_serving
+async def http_session_shutdown():
+    await app.http_session.close()
+
+
 if __name__ == "__main__":
     print('''>>>\nuse @login_required when the login is required and use\nfrom utils.prerequirements import login_required''')
     app.run(debug=True, host='0.0.0.0', port=8800)
\ No newline at end of file
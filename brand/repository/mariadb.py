@@ -1,6 +1,17 @@
-from datetime import datetime
 from quart import current_app
 from asyncmy.cursors import DictCursor
+from utils.cache import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (brand_id, user_id) pairs that passed an ownership check, read by platforms.shopify.mariadb
+# only grants are cached, every write to brand_access has to call invalidate_brand_access
+brand_access_cache = TTLCache(ttl=60, maxsize=4096)
+
+
+def invalidate_brand_access(brand_id, user_id):
+    brand_access_cache.invalidate((brand_id, user_id))
 
 # handling the database quiries related to brands to handle brands
 
@@ -11,6 +22,9 @@ class Write:
         async with pool.acquire() as connection:
             async with connection.cursor(cursor=DictCursor) as cursor:
                 try:
+                    # the pool runs in autocommit, the brand and its access row must land together
+                    await connection.begin()
+
                     query = """
                         INSERT INTO brand (
                             brand_id,
@@ -22,7 +36,7 @@ class Write:
                             established_year,
                             poc,
                             created_at
-                        ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                        ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,CURDATE())
                     """
                     await cursor.execute(query, (
                         brand_id,
@@ -32,14 +46,14 @@ class Write:
                         brand_data.get('plan'),
                         brand_data.get('address'),
                         brand_data.get('estyear'),
-                        user_id,
-                        datetime.now().date()
+                        user_id
                     ))
                     await cursor.execute('''INSERT INTO brand_access (brand_id, user_id)
                         VALUES(%s, %s)''', (brand_id, user_id))
                     await connection.commit()
+                    invalidate_brand_access(brand_id, user_id)
                 except Exception as e:
-                    print(f'error occured while registering brand as \n{e}')
+                    logger.exception('error occured while registering brand')
                     await connection.rollback()
                     return 'failed'
                 return 'ok'
@@ -55,8 +69,30 @@ class Write:
                     """
                     await cursor.execute(query, (brand_id, user_id))
                     await connection.commit()
+                    invalidate_brand_access(brand_id, user_id)
+                except Exception as e:
+                    logger.exception('error occured while mapping user to the brand')
+                    await connection.rollback()
+                    raise
+
+    @staticmethod
+    async def map_users_brand(user_ids, brand_id):
+        '''maps several users to one brand, executemany sends them as a single multi row INSERT'''
+        pool = current_app.pool
+        async with pool.acquire() as connection:
+            async with connection.cursor(cursor=DictCursor) as cursor:
+                try:
+                    await connection.begin()
+                    query = """
+                        INSERT INTO brand_access (brand_id, user_id)
+                        VALUES (%s,%s)
+                    """
+                    await cursor.executemany(query, [(brand_id, user_id) for user_id in user_ids])
+                    await connection.commit()
+                    for user_id in user_ids:
+                        invalidate_brand_access(brand_id, user_id)
                 except Exception as e:
-                    print(f'error occured while mapping user to the brand as \n {e}')
+                    logger.exception('error occured while mapping users to the brand')
                     await connection.rollback()
                     raise
 
@@ -76,7 +112,7 @@ class Fetch:
                     brand_access = await cursor.fetchall()
                     return brand_access
                 except Exception as e:
-                    print(f"error occured during fetching brand access of the user {user_id}\n{e}")
+                    logger.exception('error occured during fetching brand access of the user %s', user_id)
                     return None
                 
     
@@ -92,7 +128,7 @@ class Fetch:
                     result = await cursor.fetchone() 
                     return "available" if result and result.get('1') == 1 else "unavailable"
                 except Exception as e:
-                    print(f"error during checking the brand availability")
+                    logger.exception('error during checking the brand availability')
                     return ("error", "unable to fulfill the request")
 
 
@@ -112,5 +148,5 @@ class Fetch:
                     # print(brand_name)
                     return brand_name
                 except Exception as e:
-                    print(f"error during fetching the brand_name from the brand table in brand_name_by_id\n{e}")
+                    logger.exception('error during fetching the brand_name from the brand table in brand_name_by_id')
                     return ("error", "unable to fulfill the request")
\ No newline at end of file
@@ -1,12 +1,38 @@
 from quart import Blueprint, session, request, jsonify
-from user.repository import mariadb
+from user.repository import mariadb as userdb
 from utils.helper import User, Helper, Brand
 from brand.repository import mariadb
 from utils.prerequirements import login_required, brand_required, super_admin_required
 from utils import products
+import logging
+
+logger = logging.getLogger(__name__)
 
 brand = Blueprint('brand', __name__)
 
+# payload keys checked by Helper.check_required_payload, built once at import
+REGISTER_BRAND_KEYS = frozenset(('brand', 'poc'))
+ACCEPTED_BRAND_KEYS = frozenset(('entity-name', 'brand-name', 'gstin', 'plan', 'address', 'pincode', 'estyear'))
+REQUIRED_BRAND_KEYS = frozenset(('entity-name', 'brand-name', 'plan', 'address', 'pincode', 'estyear'))
+ACCEPTED_POC_KEYS = frozenset(('self', 'name', 'number', 'email', 'designation', 'access', 'password'))
+REQUIRED_POC_KEYS = frozenset(('name', 'number', 'email', 'designation', 'access', 'password'))
+
+# (stored key, payload key) pairs used to build the brand and poc records
+BRAND_FIELDS = (
+    ('entity_name', 'entity-name'),
+    ('brand_name', 'brand-name'),
+    ('gstin', 'gstin'),
+    ('plan', 'plan'),
+    ('estyear', 'estyear'),
+)
+POC_FIELDS = (
+    ('name', 'name'),
+    ('number', 'number'),
+    ('email', 'email'),
+    ('access', 'access'),
+    ('designation', 'designation'),
+)
+
 # route to register the business
 @brand.route('/register-brand', methods=['POST'])
 @login_required
@@ -17,9 +43,7 @@ async def register_entity():
     '''
         checking the payload for brand
     '''
-    required_payload = ['brand', 'poc']
-    accepted_payload = required_payload
-    valid_payload = Helper.check_required_payload(response, accepted_payload, required_payload)
+    valid_payload = Helper.check_required_payload(response, REGISTER_BRAND_KEYS, REGISTER_BRAND_KEYS)
 
     if valid_payload is not True:
         return jsonify({'status': 'error', 'message': 'payload does not provide necessary values brand and poc'}), 400
@@ -28,14 +52,27 @@ async def register_entity():
     brand_data = response.get('brand')
     poc_data = response.get('poc')
 
-    accepted_brand_payload = ['entity-name', 'brand-name', 'gstin', 'plan', 'address', 'pincode', 'estyear']
-    required_brand_payload = ['entity-name', 'brand-name', 'plan', 'address', 'pincode', 'estyear']
-    
-    valid_payload = Helper.check_required_payload(brand_data, accepted_brand_payload, required_brand_payload)
+    valid_payload = Helper.check_required_payload(brand_data, ACCEPTED_BRAND_KEYS, REQUIRED_BRAND_KEYS)
 
     if valid_payload is not True:
         return jsonify({'status': 'error', 'message': 'payload does not provide necessary values brand-data and poc-data'}), 400
 
+    '''
+        checking the poc before anything is written, so a bad poc never leaves a brand behind
+    '''
+    if poc_data.get('self') != 'true':
+        valid_payload = Helper.check_required_payload(poc_data, ACCEPTED_POC_KEYS, REQUIRED_POC_KEYS)
+
+        if valid_payload is not True:
+            return jsonify({'status': 'error', 'message': 'payload does not provide necessary values'}), 400
+
+        # fetch access allower access_specifiers
+        access_specifier = await Brand.access_specifiers()
+
+        # checking if user specified the access
+        if access_specifier is None or poc_data['access'] not in access_specifier:
+            return jsonify({'status': 'invalid input', 'message': 'access specifiers are not valid'}), 422
+
     '''
         after checking payload for business trying to register the brand
     '''
@@ -44,14 +81,9 @@ async def register_entity():
     user_id = session.get('user')
 
     #inserting the brand
-    brand_data = {
-            'entity_name': brand_data.get('entity-name'),
-            'brand_name': brand_data.get('brand-name'),
-            'gstin': brand_data.get('gstin'),
-            'plan': brand_data.get('plan'),
-            'address': f"({brand_data.get('address')}, {brand_data.get('pincode')})",
-            'estyear': brand_data.get('estyear')
-        }        
+    address = f"({brand_data.get('address')}, {brand_data.get('pincode')})"
+    brand_data = {key: brand_data.get(payload_key) or None for key, payload_key in BRAND_FIELDS}
+    brand_data['address'] = address
 
     try:
         # Check if the user is self POC
@@ -64,42 +96,26 @@ async def register_entity():
                 return jsonify({'status': 'failed', 'message': 'error occured while registering the brand'}), 500
 
         else:
-            #checking if all the requied field is there
-
-            accepted_poc_payload = ['self', 'name', 'number', 'email', 'designation', 'access', 'password']
-            required_poc_payload = accepted_payload
-
-            valid_payload = Helper.check_required_payload(poc_data, accepted_poc_payload, required_poc_payload)
-
-            if valid_payload is not True:
-                report = jsonify({'status': 'error', 'message': 'payload does not provide necessary values'}), 400
-                # print(report)
-                return report
-             
-            # User is not POC - create new POC with generated user_id
+            # User is not POC - create new POC with generated user_id (poc payload is validated above)
             poc_user_id = User.create_userid()
 
-            # fetch access allower access_specifiers
-            access_specifier = Brand.access_specifiers()
-            
-            # checking if user specified the access
-            if poc_data['access'] not in access_specifier or poc_data.get('password')==None:
-                return jsonify({'status': 'invalid input', 'message': 'access specifiers are not valid'}), 422
-
-            user_creds={
-                'userid': poc_user_id,
-                'name': poc_data['name'],
-                'number': poc_data['number'],
-                'email': poc_data['email'],
-                'access': poc_data['access'],
-                'designation': poc_data['designation'],
-                'hashed_password': User.hash_password(poc_data.get('password'))
-                }
+            user_creds = {key: poc_data.get(payload_key) or None for key, payload_key in POC_FIELDS}
+            user_creds['userid'] = poc_user_id
+            if user_creds['email']:
+                user_creds['email'] = User.normalize_email(user_creds['email'])
+            user_creds['hashed_password'] = User.hash_password(poc_data.get('password'))
             
-            await mariadb.Write().signup_user(user_creds)
+            signup = await userdb.Write.signup_user(user_creds)
+            if signup.get('status') != 'ok':
+                if signup.get('message') == 'user_already_registered':
+                    return jsonify({'status': 'error', 'message': 'poc is already registered'}), 409
+                return jsonify({'status': 'failed', 'message': 'error occured while registering the poc'}), 500
+
             result = await mariadb.Write.insert_brand(brand_id, poc_user_id, brand_data)
 
             if result == 'failed':
+                # the poc only exists for this brand, do not leave the account behind
+                await userdb.Write.delete_user(poc_user_id)
                 return jsonify({'status': 'failed', 'message': 'error occured while registering the brand'}), 500
 
         return jsonify({
@@ -108,7 +124,7 @@ async def register_entity():
         }), 201
 
     except Exception as e:
-        print(f'error encountered while registering the brand\n{e}')
+        logger.exception('error encountered while registering the brand')
         return jsonify({'status': 'error', 'message': 'server error'}), 500
 
 
@@ -142,7 +158,7 @@ async def connect_brand(brand_id=None):
         return jsonify({'Status': {"request": "successful", "brands": None, "status": "not connected", "redirect": "/register-brand"}})
     elif len(brand_access) == 1:
         session['brand'] = brand_access[0].get('brand_id')
-        print(f"{session.get('brand')} accessed by {session.get('user')}")
+        logger.info('%s accessed by %s', session.get('brand'), session.get('user'))
         return jsonify({"Status": {"request": "successful", "brands": "single brand", "status": "connected", "redirect": "/"}})
     else:
         return jsonify({"Status": {"request": "successful", "bands": brand_access, "status": "not connected", "issue": "a brand needs to be selected", "redirect": '/select-panel'}})
\ No newline at end of file
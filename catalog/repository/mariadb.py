@@ -1,6 +1,25 @@
 from quart import current_app, json
 from asyncmy.cursors import DictCursor
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# rows sent per multi row insert during the bulk upload
+# keeps every statement well under the max_allowed_packet of the server
+BULK_INSERT_ROWS = 1000
+
+
+async def bulk_insert(cursor, insert_query: str, row_placeholder: str, rows: list):
+    '''sends the rows as extended inserts i.e. insert into ... values (...), (...)
+        one round trip per BULK_INSERT_ROWS rows instead of one per row
+    '''
+    for start in range(0, len(rows), BULK_INSERT_ROWS):
+        batch = rows[start:start+BULK_INSERT_ROWS]
+        query = insert_query + ", ".join([row_placeholder] * len(batch))
+        values = [value for row in batch for value in row]
+        await cursor.execute(query, values)
+
 
 class Write:
     @staticmethod
@@ -41,10 +60,52 @@ class Write:
 
             except Exception as e:
                 await connection.rollback()
-                print(f"error encountered while adding a single product\n{e}")
+                logger.exception('error encountered while adding a single product')
                 return {"error": e.args[0]}
             
 
+    '''adds all the catalogs of a bulk upload in a single transaction'''
+    @staticmethod
+    async def bulk_catalog(catalogs: list):
+        pool = current_app.pool
+        async with pool.acquire() as connection:
+            try:
+                async with connection.cursor(cursor=DictCursor) as cursor:
+                    await connection.begin()
+
+                    usku_query = '''insert into usku_record
+                                (usku_id, brand_id, sku_id, product_type_id)
+                                values
+                            '''
+                    usku_values = [(catalog.get('usku_id'), catalog.get('brand_id'), catalog.get('sku_id'),
+                                    catalog.get("type_id")) for catalog in catalogs]
+
+                    await bulk_insert(cursor, usku_query, "(%s, %s, %s, %s)", usku_values)
+
+                    catalog_query = '''insert into catalog
+                                        (usku_id, product_title, price,
+                                        compared_price, purchasing_cost, vendor, ean, hsn, net_weight_kg, dead_weight_kg,
+                                        volumetric_weight_kg, brand_name, updated_at)
+                                        values
+                                    '''
+                    catalog_row = "(" + ", ".join(["NULLIF(%s, '')"] * 13) + ")"
+                    updated_at = datetime.now()
+                    catalog_values = [(catalog.get("usku_id"), catalog.get("product_title"),
+                                       catalog.get("price"), catalog.get("compared_price"), catalog.get("purchasing_cost"),
+                                       catalog.get("vendor"), catalog.get("ean"), catalog.get("hsn"),
+                                       catalog.get("net_weight_kg"), catalog.get("dead_weight_kg"), catalog.get("volumetric_weight_kg"),
+                                       catalog.get("brand_name"), updated_at) for catalog in catalogs]
+
+                    await bulk_insert(cursor, catalog_query, catalog_row, catalog_values)
+                    await connection.commit()
+                    return "ok"
+
+            except Exception as e:
+                await connection.rollback()
+                logger.exception('error encountered while adding the bulk catalog')
+                return {"error": e.args[0]}
+
+
     @staticmethod
     async def image(img_obj: dict):
         pool = current_app.pool
@@ -66,7 +127,7 @@ class Write:
 
             except Exception as e:
                 await connection.rollback()
-                print(f"error encountered while adding a single product\n{e}")
+                logger.exception('error encountered while adding a single product')
                 return {"error": e.args[0]}                          
 
     @staticmethod
@@ -85,7 +146,7 @@ class Write:
                     return "ok"
             except Exception as e:
                 await connection.rollback()
-                print(f"error encountered while updating the catalog status as completed\n{e}")
+                logger.exception('error encountered while updating the catalog status as completed')
                 return {"error": e.args[0]}
 
 
@@ -105,10 +166,29 @@ class Write:
                     return "ok"
             except  Exception as e:
                 await connection.rollback()
-                print(f"error encountered while deleting the product {usku_id} from the catalog\n{e}")
+                logger.exception('error encountered while deleting the product %s from the catalog', usku_id)
                 return {"error": e.args[0]}
             
 
+    @staticmethod
+    async def delete_catalogs(usku_ids: list):
+        '''removes the products of a bulk upload again, used when their mongo attributes could not be written'''
+        pool = current_app.pool
+        async with pool.acquire() as connection:
+            try:
+                async with connection.cursor(cursor=DictCursor) as cursor:
+                    query = '''delete from usku_record
+                                where usku_id in ({})
+                            '''.format(", ".join(["%s"] * len(usku_ids)))
+
+                    await cursor.execute(query, tuple(usku_ids))
+                    await connection.commit()
+                    return "ok"
+            except Exception as e:
+                await connection.rollback()
+                logger.exception('error encountered while deleting the bulk uploaded products')
+                return {"error": e.args[0]}
+
     @staticmethod
     async def delete_image_all(usku_id: str):
         pool = current_app.pool
@@ -122,7 +202,7 @@ class Write:
                     await connection.commit()
                     return "ok"
             except Exception as e:
-                print(f"error occured while deleting the images of {usku_id}\n{e}")
+                logger.exception('error occured while deleting the images of %s', usku_id)
                 return {"error": e.args[0]}
 
             
@@ -174,7 +254,7 @@ class Write:
                     await connection.commit()
                     return "ok"
             except Exception as e:
-                print(f"error occured while updating the catalog details of {catalog.get("usku_id")}\n{e}")
+                logger.exception('error occured while updating the catalog details of %s', catalog.get("usku_id"))
                 return {"error": e.args[0]}
 
 class Fetch:
@@ -190,7 +270,7 @@ class Fetch:
                     count = await cursor.fetchone()
                     return count.get('count') if count else 0
                 except Exception as e:
-                    print(f"error encountered during fetching catalog counts\n{e}")
+                    logger.exception('error encountered during fetching catalog counts')
                     return ("error", "error in count_catalogs")
 
 
@@ -207,7 +287,7 @@ class Fetch:
                     catalog_available = await cursor.fetchone()
                     return True if catalog_available and catalog_available.get('1') else False
                 except Exception as e:
-                    print(f"error occured while fetching the catalog on is_exists_catalog function\n{e}")
+                    logger.exception('error occured while fetching the catalog on is_exists_catalog function')
                     return ("error", "could not fetch the availability from the usku_record")
                 
     @staticmethod
@@ -222,7 +302,7 @@ class Fetch:
                     usku = await cursor.fetchone()
                     return True if usku and usku.get('1') else False
                 except Exception as e:
-                    print(f"error occured while fetching the usku_record on is_usku_id_exists function\n{e}")
+                    logger.exception('error occured while fetching the usku_record on is_usku_id_exists function')
                     return ("error", "could not fetch the availability from the usku_record")
                 
     @staticmethod
@@ -242,9 +322,25 @@ class Fetch:
                     else:
                         return {}
                 except Exception as e:
-                    print(f"error occured while fetching the sku_id from the brand {brand_id}\n{e}")
+                    logger.exception('error occured while fetching the sku_id from the brand %s', brand_id)
                     return None
 
+    @staticmethod
+    async def existing_sku_ids(sku_ids: list, brand_id):
+        '''the sku ids out of sku_ids the brand already has, in one query'''
+        pool = current_app.pool
+        async with pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                try:
+                    query = '''select sku_id from usku_record where brand_id=%s and sku_id in ({})'''.format(
+                        ", ".join(["%s"] * len(sku_ids)))
+
+                    await cursor.execute(query, (brand_id, *sku_ids))
+                    return {row[0] for row in await cursor.fetchall()}
+                except Exception as e:
+                    logger.exception('error occured while fetching the sku_ids of the brand %s', brand_id)
+                    return set()
+
     @staticmethod
     async def niches():
         pool = current_app.pool
@@ -261,7 +357,7 @@ class Fetch:
                     else:
                         raise Exception("Could not fetch the niches")
             except Exception as e:
-                print(f"error encountered while fetching the niches in niche_id function\n{e}")
+                logger.exception('error encountered while fetching the niches in niche_id function')
                 return ("error", "could not fetch the niches")
             
     
@@ -282,7 +378,7 @@ class Fetch:
                     else:
                         raise Exception("Could not fetch the sub niches")
             except Exception as e:
-                print(f"error encountered while fetching the subniches in sub_niches function\n{e}")
+                logger.exception('error encountered while fetching the subniches in sub_niches function')
                 return ("error", "could not fetch the sub_niches")
             
     
@@ -303,7 +399,7 @@ class Fetch:
                     else:
                         raise Exception("Could not fetch the niche categories")
             except Exception as e:
-                print(f"error encountered while fetching the niche_categories\n{e}")
+                logger.exception('error encountered while fetching the niche_categories')
                 return ("error", "could not fetch the niche-categories")
             
     
@@ -324,7 +420,7 @@ class Fetch:
                     else:
                         raise Exception("Could not fetch the niche products")
             except Exception as e:
-                print(f"error encountered while fetching the niche_products in niche_products function\n{e}")
+                logger.exception('error encountered while fetching the niche_products in niche_products function')
                 return ("error", "could not fetch the niche_products")
 
 
@@ -359,7 +455,7 @@ class Fetch:
                         else:
                             return urls
             except Exception as e:
-                print(f"error occured while fetching the image urls\n{e}")
+                logger.exception('error occured while fetching the image urls')
                 return "error"
     
 
@@ -382,7 +478,7 @@ class Fetch:
                     catalog = await cursor.fetchone()
                     return catalog if catalog else {}
             except Exception as e:
-                print(f"error occured while fetching the catalog data for {usku_id}\n{e}")
+                logger.exception('error occured while fetching the catalog data for %s', usku_id)
                 return {"error": e.args[0]}
 
 
@@ -410,7 +506,7 @@ class Fetch:
                     
                     return catalog_data
             except Exception as e:
-                print(f"error occured while fetching the catalog lists\n{e}")
+                logger.exception('error occured while fetching the catalog lists')
                 return "error"
             
 
@@ -432,5 +528,5 @@ class Fetch:
                     catalog_data = await cursor.fetchone()
                     return catalog_data
             except Exception as e:
-                print(f"error occured while fetching the catalog upload counts\n{e}")
+                logger.exception('error occured while fetching the catalog upload counts')
                 return "error"
\ No newline at end of file
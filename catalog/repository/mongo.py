@@ -1,4 +1,7 @@
 from quart import current_app, jsonify
+import logging
+
+logger = logging.getLogger(__name__)
 
 # returns the only niche specific keys without the type_id
 def get_keys(doc):
@@ -19,9 +22,24 @@ class Write:
                 await mongo.db.product_attributes.insert_one(catalog)
             except Exception as e:
                 connection.abort_transaction()
-                print(e)
+                logger.exception('error encountered while adding the catalog attributes')
                 return {"error": str(e)}
             
+    # function to add all the catalogs of a bulk upload in one go
+    async def bulk_catalog(catalogs: list):
+        '''no session or transaction here, multi document transactions need a replica set and the inserts
+        have to keep working on a standalone mongod. the caller deletes the sql rows when this does not return "ok"'''
+        mongo = current_app.mongo
+        try:
+            await mongo.db.product_attributes.insert_many(catalogs)
+            return "ok"
+        except Exception as e:
+            logger.exception('error encountered while adding the bulk catalog attributes')
+            # insert_many stops at the first failure, take out the documents that did land
+            await mongo.db.product_attributes.delete_many(
+                {"usku_id": {"$in": [catalog.get("usku_id") for catalog in catalogs]}})
+            return {"error": str(e)}
+
     async def update_catalog(catalog: dict):
         mongo = current_app.mongo
         async with await mongo.cx.start_session() as connection:
@@ -32,7 +50,7 @@ class Write:
                     return "ok"
                 except Exception as e:
                     connection.abort_transaction()
-                    print(e)
+                    logger.exception('error encountered while updating the catalog attributes of %s', catalog.get("usku_id"))
                     return {"error": str(e)}
                 
     async def delete_catalog(usku_id: str):
@@ -44,7 +62,7 @@ class Write:
                     return "ok"
                 except Exception as e:
                     connection.abort_transaction()
-                    print(e)
+                    logger.exception('error encountered while deleting the catalog attributes of %s', usku_id)
                     return {"error": str(e)}
 
 
@@ -63,7 +81,7 @@ class Fetch:
 
             return doc
       except Exception as e:
-            print(e)
+            logger.exception('error encountered while fetching the catalog schema for type %s', type_id)
             return {"error": str(e)}
       
 
@@ -77,7 +95,7 @@ class Fetch:
             
             return doc
         except Exception as e:
-            print(e)
+            logger.exception('error encountered while fetching the image schema for type %s', type_id)
             return {"error": str(e)}
         
     # fetch catalog product data
@@ -91,7 +109,7 @@ class Fetch:
 
             return doc
         except Exception as e:
-            print(e)
+            logger.exception('error encountered while fetching the catalog attributes of %s', usku_id)
             return {"error": str(e)}
           
     
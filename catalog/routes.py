@@ -1,5 +1,5 @@
 from quart import Blueprint, session, request, jsonify, Response, current_app, abort, json
-from brand.repository import mariadb
+from brand.repository import mariadb as branddb
 from utils.prerequirements import login_required, brand_required
 from catalog.repository import mariadb
 from utils import helper, products
@@ -9,10 +9,15 @@ from datetime import datetime
 from catalog.repository import mongo
 import asyncio
 from collections import Counter
+import logging
+
+logger = logging.getLogger(__name__)
 
 catalog = Blueprint('catalog', __name__)
 niche_data = None
 
+SINGLE_CATALOG_KEYS = frozenset(("type", "data"))
+
 
 # check if the user has even added a single catalog or not.
 @catalog.get('/catalog/if-exists')
@@ -62,7 +67,7 @@ async def get_niche_data():
                             for niche in niches
                         }
     except Exception as e:
-        print(e)
+        logger.exception('could not build the niche tree')
         return jsonify({"error": "failed", "msg": "could not complete the request"}), 500
 
     return jsonify({"niche_data": niche_data}), 200
@@ -76,9 +81,8 @@ async def upload_single_catalog():
 
     payload = await request.get_json()
 
-    accepted_main_keys = ["type", "data"]
-    if not helper.Helper.check_required_payload(payload, accepted_main_keys, accepted_main_keys):
-        return jsonify({"status": "invalid payload", "missing keys": accepted_main_keys}), 422
+    if not helper.Helper.check_required_payload(payload, SINGLE_CATALOG_KEYS, SINGLE_CATALOG_KEYS):
+        return jsonify({"status": "invalid payload", "missing keys": sorted(SINGLE_CATALOG_KEYS)}), 422
 
     data = payload.get('data')
     niche_type = payload.get('type')
@@ -94,12 +98,12 @@ async def upload_single_catalog():
     accepted_data_keys = system_keys[0]
     necessary_data_keys = system_keys[1]
 
-    if not helper.Helper.check_required_payload(data, accepted_data_keys, necessary_data_keys):
+    if not helper.Helper.check_required_payload(data, frozenset(accepted_data_keys), frozenset(necessary_data_keys)):
         return jsonify({"status": "invalid payload", "accepted_keys": accepted_data_keys, "mandatory": necessary_data_keys}), 400
 
     
     ## ADDING THE THE DATA IN THE SQL
-    brand_name = await mariadb.Fetch.brand_name_by_id(session.get('brand'))
+    brand_name = await branddb.Fetch.brand_name_by_id(session.get('brand'))
 
     catalog = {
     "brand_id": session.get('brand'),
@@ -172,16 +176,28 @@ async def upload_bulk_catalog():
         if not then exit the function 
     '''
 
-    mandatory_fields = await mongo.Fetch.attributes(type_id).mandatory()  
-    all_fields = await mongo.Fetch.attributes(type_id).all()
-
-    niche_specific_fields = await mongo.Fetch.attributes(type_id).niche_specific()
-
-    sheet = await asyncio.to_thread(sheets.read_xlsx, xlsx_sheet)
+    # the attribute lookups, the sheet parse, the brand name and the catalog count do not depend on each other
+    # the rows are inserted together after the loop, so one count serves every usku id of the sheet
+    mandatory_fields, all_fields, niche_specific_fields, sheet, brand_name, usku_count = await asyncio.gather(
+        mongo.Fetch.attributes(type_id).mandatory(),
+        mongo.Fetch.attributes(type_id).all(),
+        mongo.Fetch.attributes(type_id).niche_specific(),
+        asyncio.to_thread(sheets.read_xlsx, xlsx_sheet),
+        branddb.Fetch.brand_name_by_id(session.get('brand')),
+        mariadb.Fetch.count_catalogs()
+    )
 
     new_sheet = None
-    brand_name = await mariadb.Fetch.brand_name_by_id(session.get('brand'))
     error_encountered = False
+
+    '''valid rows are collected and written together in a single transaction'''
+    sql_catalogs = []
+    mongo_catalogs = []
+    uploaded_rows = []
+    sku_rows = {} # sku_id -> first sheet row using it, to name the row of a duplicate
+    # built once for the whole sheet instead of once per row
+    accepted_keys = frozenset(all_fields)
+    necessary_keys = frozenset(mandatory_fields)
     for iteration, document in enumerate(sheet):
 
         '''only check once if headers are tempered or not'''
@@ -195,10 +211,15 @@ async def upload_bulk_catalog():
             document["vendor"] = brand_name
 
         '''validate the document whether all the required fields are given or not'''
-        valid_paylaod = helper.Helper.check_required_payload(document, all_fields, mandatory_fields)
+        valid_paylaod = helper.Helper.check_required_payload(document, accepted_keys, necessary_keys)
     
         if valid_paylaod == True:
-            usku_id = await products.create_usku()
+            sku_id = document.get("sku_id")
+            if sku_id in sku_rows:
+                return jsonify({"status": "failed", "msg": f"duplicate Sku id at row {iteration+2}, already used at row {sku_rows[sku_id]}"}), 409
+            sku_rows[sku_id] = iteration+2
+
+            usku_id = products.build_usku(usku_count)
 
             sql_catalog_data = {key: document.get(key) for key in document if key not in niche_specific_fields}
 
@@ -211,21 +232,39 @@ async def upload_bulk_catalog():
             mongo_catalog_data["type_id"] = type_id
             mongo_catalog_data["usku_id"] = usku_id
 
-            response = await mariadb.Write.catalog(sql_catalog_data)
-            
-            if response == "ok":
-                if new_sheet == None:
-                    new_sheet = xlsx_sheet
-
-                await mongo.Write.single_catalog(mongo_catalog_data)
-                new_sheet = await asyncio.to_thread(sheets.remove_row, new_sheet, iteration+2) # iteration starts from 0 and gives first row so he have to add 1
-            else:
-                if response.get("error") == 1062:
-                    return jsonify({"status": "failed", "msg": f"duplicate Sku id at row {iteration+2}"}), 409
-                error_encountered = True
+            sql_catalogs.append(sql_catalog_data)
+            mongo_catalogs.append(mongo_catalog_data)
+            uploaded_rows.append(iteration+2) # iteration starts from 0 and gives first row so he have to add 1
         else:
             error_encountered = True
 
+    if sql_catalogs:
+        response = await mariadb.Write.bulk_catalog(sql_catalogs)
+
+        if response != "ok":
+            if response.get("error") == 1062:
+                # the sheet itself has no repeats (checked above) so the clash is with an sku the brand already has
+                existing = await mariadb.Fetch.existing_sku_ids(list(sku_rows), session.get("brand"))
+                rows = sorted(sku_rows[sku_id] for sku_id in existing)
+                if rows:
+                    return jsonify({"status": "failed", "msg": f"duplicate Sku id at row {rows[0]}, nothing was uploaded", "rows": rows}), 409
+                return jsonify({"status": "failed", "msg": "duplicate Sku id in the sheet, nothing was uploaded"}), 409
+            return jsonify({"status": "failed", "msg": "could not upload the sheet"}), 500
+
+        try:
+            mongo_response = await mongo.Write.bulk_catalog(mongo_catalogs)
+        except Exception:
+            # e.g. the session/transaction could not be started
+            logger.exception('could not write the bulk catalog attributes')
+            mongo_response = None
+
+        if mongo_response != "ok":
+            # the sql rows are already committed, take them out again so both stores stay in step
+            await mariadb.Write.delete_catalogs([catalog["usku_id"] for catalog in sql_catalogs])
+            return jsonify({"status": "failed", "msg": "could not upload the sheet"}), 500
+
+        new_sheet = await asyncio.to_thread(sheets.remove_rows, xlsx_sheet, uploaded_rows)
+
     '''return the sheet containing the data which could not be uploaded due to mandatory data not being available'''
     if error_encountered == True and new_sheet != None:
         return Response(new_sheet), 422
@@ -248,8 +287,8 @@ async def get_bulk_upload_sheet():
     except Exception:
         return jsonify({"status": "invalid id", "msg": "id should be an integer"}), 400
 
-    headers = await mongo.Fetch.attributes(product_type_id).all()
-    mandatory_fields = await mongo.Fetch.attributes(product_type_id).mandatory()
+    headers, mandatory_fields = await asyncio.gather(mongo.Fetch.attributes(product_type_id).all(),
+                                                     mongo.Fetch.attributes(product_type_id).mandatory())
     sheet = await asyncio.to_thread(sheets.create_xlsx, headers, mandatory_fields)
     return  Response(sheet)
 
@@ -537,10 +576,10 @@ async def update_catalog_data():
     # print("\n")
     # print(accepted_payload)
 
-    if not helper.Helper.check_required_payload(data, accepted_payload, mandatory_payload):
+    if not helper.Helper.check_required_payload(data, frozenset(accepted_payload), frozenset(mandatory_payload)):
         return jsonify({"status": "failed", "msg": "invalid payload"}), 400
     
-    brand_name = await mariadb.Fetch.brand_name_by_id(session.get('brand'))
+    brand_name = await branddb.Fetch.brand_name_by_id(session.get('brand'))
 
     # data for sql
     catalog = {
@@ -3,6 +3,9 @@ from quart import current_app, json
 import asyncmy
 from asyncmy.cursors import DictCursor
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Write:
 
@@ -24,6 +27,8 @@ class Write:
         async with pool.acquire() as connection:
             try:
                 async with connection.cursor() as cursor:
+                    # the pool runs in autocommit, the inward, its items and the shipment must land together
+                    await connection.begin()
                     query = '''
                                 insert into inward(brand_id, supplier_id, warehouse_id, created_at)
                                 values(%s, %s, %s, %s)
@@ -33,15 +38,19 @@ class Write:
                     await cursor.execute(query, values)
                     inward_id = cursor.lastrowid
                     
-                    for usku_id, obj in inward_data.get("usku_ids", {}).items():
+                    # all items go in one multi row insert through executemany
+                    items = [
+                        (inward_id, usku_id, obj.get("po"), obj.get("exp_stock"), obj.get("receievd", 0),
+                         obj.get("rejected", 0), obj.get("uom"))
+                        for usku_id, obj in inward_data.get("usku_ids", {}).items()
+                    ]
+                    if items:
                         query = '''
                                     insert into inward_items(inward_id, usku_id, po_num, expected_qtt, received_qtt, 
                                     rejected, uom)
                                     values(%s, %s, %s, %s, %s, %s, %s)
                                 '''
-                        values = (inward_id, usku_id, obj.get("po"), obj.get("exp_stock"), obj.get("receievd", 0), 
-                                  obj.get("rejected", 0), obj.get("uom"))
-                        await cursor.execute(query, values)
+                        await cursor.executemany(query, items)
                     
                     shipment = inward_data.get("shipment")
                     query = '''
@@ -57,7 +66,7 @@ class Write:
                     await connection.commit()
                     return inward_id        
             except Exception as e:
-                print(f"error occured while creating inward\n{e}")
+                logger.exception('error occured while creating inward')
                 await connection.rollback()
                 return "error"
 
@@ -81,7 +90,7 @@ class Write:
                     await connection.commit()
                     return supplier_id
             except Exception as e:
-                print(f"error encountered while adding supplier\n{e}")
+                logger.exception('error encountered while adding supplier')
                 await connection.rollback()
                 return "error"
             
@@ -103,7 +112,7 @@ class Write:
                     await connection.commit()
                     return warehouse_id
             except Exception as e:
-                print(f"error encountered while adding warehouse\n{e}")
+                logger.exception('error encountered while adding warehouse')
                 await connection.rollback()
                 return "error"
             
@@ -124,7 +133,7 @@ class Write:
                     await connection.commit()
                     return "ok"
             except Exception as e:
-                print(f"error enountered while adding grn record\n{e}")
+                logger.exception('error enountered while adding grn record')
                 await connection.rollback()
                 return "error"
 
@@ -205,7 +214,7 @@ class Update:
                     await connection.commit()
                     return grn_id
             except Exception as e:
-                print(f"Error countered while updating the inward for brand {brand_id}\n {e}")
+                logger.exception('Error countered while updating the inward for brand %s', brand_id)
                 return "error"
 
 
@@ -240,7 +249,7 @@ class Fetch:
                     inventory = await cursor.fetchall()
                     return inventory
             except Exception as e:
-                print(f"error encountered whie fetching the inventory for {brand_id}\n{e}")
+                logger.exception('error encountered whie fetching the inventory for %s', brand_id)
                 return "error"
 
 
@@ -268,7 +277,7 @@ class Fetch:
                     stock = await cursor.fetchone()
                     return stock if stock else {}
             except Exception as e:
-                print(f"error encountered whie fetching the stock count from inventory for {brand_id}\n{e}")
+                logger.exception('error encountered whie fetching the stock count from inventory for %s', brand_id)
                 return "error"
 
     
@@ -291,7 +300,7 @@ class Fetch:
                     count = await cursor.fetchone()
                     return count if count else {}
             except Exception as e:
-                print(f"error encountered whie fetching the inward count for {brand_id}\n{e}")
+                logger.exception('error encountered whie fetching the inward count for %s', brand_id)
                 return "error"
     
     @staticmethod
@@ -376,7 +385,7 @@ class Fetch:
 
                     return inwards
             except Exception as e:
-                print(f"error encountered whie fetching the inward for {brand_id}\n{e}")
+                logger.exception('error encountered whie fetching the inward for %s', brand_id)
                 return "error"
             
 
@@ -410,7 +419,7 @@ class Fetch:
 
                     return suppliers
             except Exception as e:
-                print(f"error occured while fetching the suppliers of the brand for the brandid=>{brand_id}\n{e}")
+                logger.exception('error occured while fetching the suppliers of the brand for the brandid=>%s', brand_id)
                 return {"error": e.args[0]}
             
     
@@ -443,7 +452,7 @@ class Fetch:
 
                     return supplier
             except Exception as e:
-                print(f"error occured while fetching the supplier of the brand for the brandid=>{brand_id}\n{e}")
+                logger.exception('error occured while fetching the supplier of the brand for the brandid=>%s', brand_id)
                 return {"error": e.args[0]}
             
 
@@ -477,7 +486,7 @@ class Fetch:
 
                     return warehouses
             except Exception as e:
-                print(f"error occured while fetching the warehouse of the brand for the brandid=>{brand_id}\n{e}")
+                logger.exception('error occured while fetching the warehouse of the brand for the brandid=>%s', brand_id)
                 return {"error": e.args[0]}
             
     @staticmethod
@@ -510,7 +519,7 @@ class Fetch:
 
                     return warehouse
             except Exception as e:
-                print(f"error occured while fetching the warehouse of the brand for the brandid=>{brand_id}\n{e}")
+                logger.exception('error occured while fetching the warehouse of the brand for the brandid=>%s', brand_id)
                 return {"error": e.args[0]}
 
     @staticmethod
@@ -530,5 +539,5 @@ class Fetch:
                     await connection.commit()
                     return count.get("count") if count else "error"
             except Exception as e:
-                print(f"error occured while fetching the grn count for the inward {inward_id}\n{e}")
+                logger.exception('error occured while fetching the grn count for the inward %s', inward_id)
                 return {"error", e.args[0]}
\ No newline at end of file
@@ -4,9 +4,20 @@ from utils.prerequirements import login_required, brand_required
 from inventory.repository import mariadb
 from utils.helper import Helper
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 inventory = Blueprint("inventory", __name__)
 
+# payload keys checked by Helper.check_required_payload, built once at import
+INWARD_KEYS = frozenset(("supplier_id", "usku_ids", "shipment", "warehouse_id"))
+ACCEPTED_SHIPMENT_KEYS = frozenset(("shipment-ref", "vehicle-no", "transporter", "challan", "arrival-date"))
+MANDATORY_SHIPMENT_KEYS = frozenset(("transporter",))
+INWARD_UPLOAD_KEYS = frozenset(("usku_ids",))
+ACCEPTED_ADDRESS_KEYS = frozenset(("name", "number", "email", "house", "street", "locality", "city", "state", "pincode"))
+MANDATORY_ADDRESS_KEYS = frozenset(("name", "number", "email", "locality", "city", "state", "pincode"))
+
 '''diff between inventory and catalog is catalog returns the product info without stock
     and inventory returns only the necessary details and the available stock
 '''
@@ -59,7 +70,7 @@ async def inward_count():
     brand_id = session.get("brand")
 
     inward_id = request.args.get("id")
-    print(inward_id)
+    logger.debug('inward count for %s', inward_id)
 
     if inward_id:
         inward = await mariadb.Fetch.inward(None, brand_id, inward_id)
@@ -82,18 +93,12 @@ async def create_inward():
     
     '''payload check'''
     payload = await request.get_json()
-    print(payload)
-    accepted_payload = ["supplier_id", "usku_ids", "shipment", "warehouse_id"]
-    mandatory_payload = accepted_payload
-
-    if not Helper.check_required_payload(payload, accepted_payload, mandatory_payload):
+    logger.debug('inward payload %s', payload)
+    if not Helper.check_required_payload(payload, INWARD_KEYS, INWARD_KEYS):
         return jsonify({"status": "denied", "msg": "invalid payload"}), 400
     
     shipment_payload = payload.get("shipment")
-    accepted_shipment_payload = ["shipment-ref", "vehicle-no", "transporter", "challan", "arrival-date"]
-    mandatory_payload_shipment = ["transporter"]
-
-    if not Helper.check_required_payload(shipment_payload, accepted_shipment_payload, mandatory_payload_shipment):
+    if not Helper.check_required_payload(shipment_payload, ACCEPTED_SHIPMENT_KEYS, MANDATORY_SHIPMENT_KEYS):
         return jsonify({"status": "denied", "msg": "invalid shipment payload"}), 400
 
 
@@ -119,10 +124,7 @@ async def upload_inward():
         return jsonify({"status": "rejected", "msg": "invalid request"}), 400
     
     payload = await request.get_json()
-    accepted_paylaod = ["usku_ids"]
-    mandatory_paylaod = accepted_paylaod
-
-    if not Helper.check_required_payload(payload, accepted_paylaod, mandatory_paylaod):
+    if not Helper.check_required_payload(payload, INWARD_UPLOAD_KEYS, INWARD_UPLOAD_KEYS):
         return jsonify({"status": "failed", "msg": "invalid payload"}), 422
     
 
@@ -148,10 +150,7 @@ async def upload_inward():
 async def add_supplier():
     payload = await request.get_json()
 
-    accepted_payload = ["name", "number", "email", "house", "street", "locality", "city", "state", "pincode"]
-    mandatory_payload = ["name", "number", "email", "locality", "city", "state", "pincode"]
-
-    if not Helper.check_required_payload(payload, accepted_payload, mandatory_payload):
+    if not Helper.check_required_payload(payload, ACCEPTED_ADDRESS_KEYS, MANDATORY_ADDRESS_KEYS):
         return jsonify({"status": "invalid payload", "msg": "payload is either missing mandatory payload or sending unaccepted payload"}), 400
     
     '''
@@ -208,10 +207,7 @@ async def add_warehouse():
 
     payload = await request.get_json()
 
-    accepted_payload = ["name", "number", "email", "house", "street", "locality", "city", "state", "pincode"]
-    mandatory_payload = ["name", "number", "email", "locality", "city", "state", "pincode"]
-
-    if not Helper.check_required_payload(payload, accepted_payload, mandatory_payload):
+    if not Helper.check_required_payload(payload, ACCEPTED_ADDRESS_KEYS, MANDATORY_ADDRESS_KEYS):
         return jsonify({"status": "denied", "msg": "invalid payload"}), 400
     
     pincode = str(payload.get("pincode"))
@@ -0,0 +1,9 @@
+-- Idempotency keys only need to live long enough to absorb client retries.
+-- Purge rows older than a day so uniq_idem_user_brand stays small.
+-- Requires the event scheduler: SET GLOBAL event_scheduler = ON;
+
+CREATE EVENT IF NOT EXISTS catalogue_idempotency_purge
+    ON SCHEDULE EVERY 1 HOUR
+    DO
+        DELETE FROM catalogue_idempotency
+        WHERE created_at < NOW() - INTERVAL 24 HOUR;
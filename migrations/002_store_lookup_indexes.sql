@@ -0,0 +1,10 @@
+-- get_user_stores:   WHERE user_id = ? AND is_active = TRUE ORDER BY is_primary DESC, created_at DESC
+-- get_primary_store: WHERE user_id = ? AND is_primary = TRUE AND is_active = TRUE
+-- One index serves both: equality on (user_id, is_active), then is_primary/created_at
+-- are read in index order (scanned backwards), so the listing needs no filesort.
+ALTER TABLE stores
+    ADD INDEX IF NOT EXISTS idx_stores_user_active_primary_created (user_id, is_active, is_primary, created_at);
+
+-- get_brand_stores: WHERE brand_id = ? ORDER BY created_at DESC
+ALTER TABLE shopify_stores
+    ADD INDEX IF NOT EXISTS idx_shopify_stores_brand_created (brand_id, created_at);
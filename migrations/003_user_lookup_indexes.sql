@@ -0,0 +1,12 @@
+-- login / userid_by_email look users up by email on every sign in.
+-- Unique, so a second signup with the same email fails with 1062 (user_already_registered)
+-- instead of creating an account that can never log in. Remove duplicate emails before applying.
+ALTER TABLE user_creds
+    ADD UNIQUE INDEX IF NOT EXISTS ux_user_creds_email (user_email);
+
+-- connect_brand / verify_brand_ownership: WHERE user_id = ? [AND brand_id = ?]
+ALTER TABLE brand_access
+    ADD INDEX IF NOT EXISTS idx_brand_access_user_brand (user_id, brand_id);
+
+-- stores(user_id) lookups are served by the leftmost column of
+-- idx_stores_user_active_primary_created (002), users/stores are keyed by their primary keys.
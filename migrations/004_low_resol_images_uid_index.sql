@@ -0,0 +1,4 @@
+-- list_products counts images per product with (SELECT COUNT(*) FROM low_resol_images WHERE uid = f.uid),
+-- the image lookups by uid use the same index.
+ALTER TABLE low_resol_images
+    ADD INDEX IF NOT EXISTS idx_low_resol_images_uid (uid);
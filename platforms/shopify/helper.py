@@ -6,6 +6,7 @@ from shopify_archives.exceptions import AuthorizationError, ShopifyAPIError
 import hmac
 import hashlib
 import os
+import requests
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -35,7 +36,6 @@ def validate_shopify_token(shop_name: str, access_token: str) -> None:
     }
     """
     try:
-        import requests
         resp = requests.post(
             client.endpoint,
             json={"query": query},
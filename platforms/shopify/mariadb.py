@@ -1,6 +1,68 @@
 from quart import current_app
 from asyncmy.cursors import DictCursor
+from functools import lru_cache
+import logging
 from utils.encryption import TokenEncryption
+from utils.cache import TTLCache
+from brand.repository.mariadb import brand_access_cache
+
+logger = logging.getLogger(__name__)
+
+# store rows change rarely, cache the per-user lookups for a short while
+user_stores_cache = TTLCache(ttl=60)
+primary_store_cache = TTLCache(ttl=60)
+
+
+def invalidate_user_stores(user_id: str):
+    user_stores_cache.invalidate(user_id)
+    primary_store_cache.invalidate(user_id)
+
+
+# update_store always sends this one statement, a None parameter keeps the column as it is
+STORE_UPDATE_FIELDS = ('shopify_shop_name', 'shopify_access_token', 'store_name', 'is_primary')
+STORE_UPDATE_COLUMNS = {'shopify_access_token': 'shopify_access_token_encrypted'}
+STORE_UPDATE_QUERY = '''
+    UPDATE stores
+    SET shopify_shop_name = COALESCE(%s, shopify_shop_name),
+        shopify_access_token_encrypted = COALESCE(%s, shopify_access_token_encrypted),
+        store_name = COALESCE(%s, store_name),
+        is_primary = COALESCE(%s, is_primary)
+    WHERE store_id = %s AND user_id = %s
+'''
+
+# fashion columns after uid/brand_id follow PRODUCT_UPDATE_FIELDS, create_products_bulk relies on that order
+FASHION_INSERT_QUERY = '''
+    INSERT INTO fashion (
+        uid, brand_id, title, description, vendor, product_type, tags,
+        status, price, compare_at_price, sku, barcode, weight, weight_unit,
+        collections, brand_color, product_remark, series_length_ankle,
+        series_rise_waist, series_knee, gender, fit_type, print_type,
+        material, material_composition, care_instruction, art_technique, stitch_type
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+'''
+
+# columns update_product may touch, also used by the archived product service
+PRODUCT_UPDATE_FIELDS = (
+    'title', 'description', 'vendor', 'product_type', 'tags', 'status',
+    'price', 'compare_at_price', 'sku', 'barcode', 'weight', 'weight_unit',
+    'collections', 'brand_color', 'product_remark', 'series_length_ankle',
+    'series_rise_waist', 'series_knee', 'gender', 'fit_type', 'print_type',
+    'material', 'material_composition', 'care_instruction', 'art_technique', 'stitch_type'
+)
+PRODUCT_UPDATE_ALLOWED = frozenset(PRODUCT_UPDATE_FIELDS)
+PRODUCT_UPDATE_ORDER = {field: position for position, field in enumerate(PRODUCT_UPDATE_FIELDS)}
+
+
+# bounded, clients can send any subset of the fields so the number of shapes is not
+@lru_cache(maxsize=128)
+def product_update_query(fields: tuple) -> str:
+    """UPDATE statement for the given product fields, in PRODUCT_UPDATE_FIELDS order."""
+    return 'UPDATE fashion SET {} WHERE uid = %s AND brand_id = %s'.format(
+        ', '.join(f'{field} = %s' for field in fields)
+    )
 
 
 class Write:
@@ -22,15 +84,19 @@ class Write:
 
                     await conn.commit()
 
-                    # Fetch and return the created store
-                    store_id = cursor.lastrowid
-                    return {'status': 'ok', 'message': 'Store added successfully', 'store': shopify_shop_name}
+                    # build the response from the known fields instead of re-fetching the row
+                    return {
+                        'status': 'ok',
+                        'message': 'Store added successfully',
+                        'store': shopify_shop_name,
+                        'store_id': cursor.lastrowid
+                    }
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error adding store: {str(e)}')
+                    logger.exception('Error adding store')
 
-                    if hasattr(e, 'args') and e.args[0] == 1062:
+                    if e.args and e.args[0] == 1062:
                         return {'status': 'error', 'message': 'Store already exists for this Shopify shop'}
 
                     return {'status': 'error', 'message': f'Unable to add store: {str(e)}'}
@@ -44,33 +110,37 @@ class Write:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
-                    # Verify ownership
-                    await cursor.execute('SELECT user_id FROM stores WHERE store_id = %s', (store_id,))
-                    result = await cursor.fetchone()
-                    if not result or result['user_id'] != user_id:
-                        return {'status': 'error', 'message': 'Unauthorized access'}
-
-                    # Build update query
-                    updates = []
                     params = []
-                    allowed_fields = ['shopify_shop_name', 'shopify_access_token', 'store_name', 'is_primary']
-
-                    for key, value in kwargs.items():
-                        if key in allowed_fields:
-                            if key == 'shopify_access_token':
-                                encrypted_token = TokenEncryption.encrypt_token(value)
-                                updates.append('shopify_access_token_encrypted = %s')
-                                params.append(encrypted_token)
-                            else:
-                                updates.append(f'{key} = %s')
-                                params.append(value)
-
-                    if not updates:
+                    changes = {}
+                    for field in STORE_UPDATE_FIELDS:
+                        value = kwargs.get(field)
+                        if value is not None:
+                            if field == 'shopify_access_token':
+                                value = TokenEncryption.encrypt_token(value)
+                            changes[STORE_UPDATE_COLUMNS.get(field, field)] = value
+                        params.append(value)
+
+                    if not changes:
                         return {'status': 'error', 'message': 'No valid fields to update'}
 
                     params.append(store_id)
                     params.append(user_id)
 
+                    # the pool runs in autocommit, the update and unsetting other primaries must land together
+                    await conn.begin()
+
+                    # the user_id filter doubles as the ownership check, no separate select
+                    await cursor.execute(STORE_UPDATE_QUERY, params)
+                    if cursor.rowcount == 0:
+                        # rowcount only counts changed rows, so a same value update also lands here
+                        # confirm the row exists on this rare path instead of changing rowcount for the whole pool
+                        await cursor.execute('''
+                            SELECT 1 FROM stores WHERE store_id = %s AND user_id = %s
+                        ''', (store_id, user_id))
+                        if not await cursor.fetchone():
+                            await conn.rollback()
+                            return {'status': 'error', 'message': 'Unauthorized or not found'}
+
                     # If setting as primary, unset others
                     if 'is_primary' in kwargs and kwargs['is_primary']:
                         await cursor.execute('''
@@ -78,16 +148,15 @@ class Write:
                             WHERE user_id = %s AND is_primary = TRUE AND store_id != %s
                         ''', (user_id, store_id))
 
-                    query = f"UPDATE stores SET {', '.join(updates)} WHERE store_id = %s AND user_id = %s"
-                    await cursor.execute(query, params)
                     await conn.commit()
+                    invalidate_user_stores(user_id)
 
-                    store = await Fetch.get_store_by_id(store_id, user_id)
+                    store = {'store_id': store_id, 'user_id': user_id, **changes}
                     return {'status': 'ok', 'message': 'Store updated successfully', 'store': store}
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error updating store: {str(e)}')
+                    logger.exception('Error updating store')
                     return {'status': 'error', 'message': f'Unable to update store: {str(e)}'}
 
     @staticmethod
@@ -104,6 +173,7 @@ class Write:
 
                     affected_rows = cursor.rowcount
                     await conn.commit()
+                    invalidate_user_stores(user_id)
 
                     if affected_rows == 0:
                         return {'status': 'error', 'message': 'Store not found or unauthorized'}
@@ -112,7 +182,7 @@ class Write:
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error deleting store: {str(e)}')
+                    logger.exception('Error deleting store')
                     return {'status': 'error', 'message': f'Unable to delete store: {str(e)}'}
 
     @staticmethod
@@ -136,14 +206,20 @@ class Write:
 
                     await conn.commit()
 
-                    brand = await Fetch.get_brand_by_id(brand_id)
+                    # build the response from the known fields instead of re-fetching the row
+                    brand = {
+                        'brand_id': brand_id,
+                        'brand_name': brand_name,
+                        'brand_logo': brand_logo,
+                        'brand_description': brand_description
+                    }
                     return {'status': 'ok', 'message': 'Brand created successfully', 'brand': brand}
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error creating brand: {str(e)}')
+                    logger.exception('Error creating brand')
 
-                    if hasattr(e, 'args') and e.args[0] == 1062:
+                    if e.args and e.args[0] == 1062:
                         return {'status': 'error', 'message': 'Brand already exists'}
 
                     return {'status': 'error', 'message': f'Unable to create brand: {str(e)}'}
@@ -155,22 +231,14 @@ class Write:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
+                    # the pool runs in autocommit, the uid record and the product must land together
+                    await conn.begin()
+
                     # Create uid record first (associate with brand)
                     await cursor.execute('INSERT INTO uid_record (uid, brand_id) VALUES (%s, %s)', (uid, brand_id))
 
                     # Insert fashion product
-                    await cursor.execute('''
-                        INSERT INTO fashion (
-                            uid, brand_id, title, description, vendor, product_type, tags,
-                            status, price, compare_at_price, sku, barcode, weight, weight_unit,
-                            collections, brand_color, product_remark, series_length_ankle,
-                            series_rise_waist, series_knee, gender, fit_type, print_type,
-                            material, material_composition, care_instruction, art_technique, stitch_type
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                    ''', (
+                    await cursor.execute(FASHION_INSERT_QUERY, (
                         uid, brand_id, title, description,
                         kwargs.get('vendor'), kwargs.get('product_type'), kwargs.get('tags'),
                         kwargs.get('status', 'ACTIVE'),
@@ -190,13 +258,48 @@ class Write:
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error creating product: {str(e)}')
+                    logger.exception('Error creating product')
 
-                    if hasattr(e, 'args') and e.args[0] == 1062:
+                    if e.args and e.args[0] == 1062:
                         return {'status': 'error', 'message': 'Product UID already exists'}
 
                     return {'status': 'error', 'message': f'Unable to create product: {str(e)}'}
 
+    @staticmethod
+    async def create_products_bulk(products: list) -> dict:
+        """Create many products in one transaction, each dict carries uid, brand_id and the create_product fields."""
+        if not products:
+            return {'status': 'ok', 'message': 'No products to create', 'count': 0}
+
+        uid_rows = [(product['uid'], product['brand_id']) for product in products]
+        fashion_rows = [
+            (product['uid'], product['brand_id'])
+            + tuple(product.get(field, 'ACTIVE') if field == 'status' else product.get(field) for field in PRODUCT_UPDATE_FIELDS)
+            for product in products
+        ]
+
+        pool = current_app.pool
+        async with pool.acquire() as conn:
+            async with conn.cursor(cursor=DictCursor) as cursor:
+                try:
+                    await conn.begin()
+
+                    # executemany folds each INSERT ... VALUES into multi-row statements
+                    await cursor.executemany('INSERT INTO uid_record (uid, brand_id) VALUES (%s, %s)', uid_rows)
+                    await cursor.executemany(FASHION_INSERT_QUERY, fashion_rows)
+
+                    await conn.commit()
+                    return {'status': 'ok', 'message': 'Products created successfully', 'count': len(products)}
+
+                except Exception as e:
+                    await conn.rollback()
+                    logger.exception('Error creating products in bulk')
+
+                    if e.args and e.args[0] == 1062:
+                        return {'status': 'error', 'message': 'Product UID already exists'}
+
+                    return {'status': 'error', 'message': f'Unable to create products: {str(e)}'}
+
     @staticmethod
     async def update_product(uid: str, brand_id: int, **kwargs) -> dict:
         """Update product details."""
@@ -204,34 +307,21 @@ class Write:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
-                    updates = []
-                    params = []
-                    allowed_fields = [
-                        'title', 'description', 'vendor', 'product_type', 'tags', 'status',
-                        'price', 'compare_at_price', 'sku', 'barcode', 'weight', 'weight_unit',
-                        'collections', 'brand_color', 'product_remark', 'series_length_ankle',
-                        'series_rise_waist', 'series_knee', 'gender', 'fit_type', 'print_type',
-                        'material', 'material_composition', 'care_instruction', 'art_technique', 'stitch_type'
-                    ]
-
-                    for key, value in kwargs.items():
-                        if key in allowed_fields:
-                            updates.append(f'{key} = %s')
-                            params.append(value)
-
-                    if not updates:
+                    # walk the fields in a fixed order so the same subset always maps to the same statement
+                    fields = tuple(sorted(PRODUCT_UPDATE_ALLOWED.intersection(kwargs), key=PRODUCT_UPDATE_ORDER.get))
+                    if not fields:
                         return {'status': 'error', 'message': 'No valid fields to update'}
 
+                    params = [kwargs[field] for field in fields]
                     params.extend([uid, brand_id])
-                    query = f"UPDATE fashion SET {', '.join(updates)} WHERE uid = %s AND brand_id = %s"
-                    await cursor.execute(query, params)
+                    await cursor.execute(product_update_query(fields), params)
                     await conn.commit()
 
                     return {'status': 'ok', 'message': 'Product updated successfully', 'uid': uid}
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error updating product: {str(e)}')
+                    logger.exception('Error updating product')
                     return {'status': 'error', 'message': f'Unable to update product: {str(e)}'}
 
 
@@ -239,6 +329,10 @@ class Fetch:
     @staticmethod
     async def get_user_stores(user_id: str) -> list:
         """Fetch all stores for a user."""
+        stores = user_stores_cache.get(user_id)
+        if stores is not TTLCache.MISSING:
+            return stores
+
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
@@ -252,8 +346,9 @@ class Fetch:
                     ''', (user_id,))
 
                     stores = await cursor.fetchall()
+                    user_stores_cache.set(user_id, stores)
                 except Exception as e:
-                    print(f'Error fetching user stores: {str(e)}')
+                    logger.exception('Error fetching user stores')
                 return stores
 
     @staticmethod
@@ -279,12 +374,16 @@ class Fetch:
 
                     store = await cursor.fetchone()
                 except Exception as e:
-                    print(f'Error fetching store: {str(e)}')
+                    logger.exception('Error fetching store')
                 return store
 
     @staticmethod
     async def get_primary_store(user_id: str) -> dict:
         """Fetch the primary store for a user."""
+        store = primary_store_cache.get(user_id)
+        if store is not TTLCache.MISSING:
+            return store
+
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
@@ -298,8 +397,9 @@ class Fetch:
                     ''', (user_id,))
 
                     store = await cursor.fetchone()
+                    primary_store_cache.set(user_id, store)
                 except Exception as e:
-                    print(f'Error fetching primary store: {str(e)}')
+                    logger.exception('Error fetching primary store')
                 return store
 
     @staticmethod
@@ -320,7 +420,7 @@ class Fetch:
                     stores = await cursor.fetchall()
                     return stores if stores else []
                 except Exception as e:
-                    print(f'Error fetching brand stores: {str(e)}')
+                    logger.exception('Error fetching brand stores')
                 return stores
 
     @staticmethod
@@ -339,12 +439,15 @@ class Fetch:
 
                     brand = await cursor.fetchone()
                 except Exception as e:
-                    print(f'Error fetching brand: {str(e)}')
+                    logger.exception('Error fetching brand')
                 return brand
 
     @staticmethod
     async def verify_brand_ownership(brand_id: int, user_id: str) -> bool:
         """Verify that a user has access to a brand."""
+        if brand_access_cache.get((brand_id, user_id), False):
+            return True
+
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
@@ -354,9 +457,12 @@ class Fetch:
                         (brand_id, user_id)
                     )
                     result = await cursor.fetchone()
-                    return result is not None
+                    if result is None:
+                        return False
+                    brand_access_cache.set((brand_id, user_id), True)
+                    return True
                 except Exception as e:
-                    print(f'Error verifying brand ownership: {str(e)}')
+                    logger.exception('Error verifying brand ownership')
                     return False
 
     @staticmethod
@@ -392,7 +498,7 @@ class Fetch:
 
                     product = await cursor.fetchone()
                 except Exception as e:
-                    print(f'Error fetching product: {str(e)}')
+                    logger.exception('Error fetching product')
                 return product
 
     @staticmethod
@@ -416,34 +522,21 @@ class Fetch:
 
                     query = f"""
                         SELECT f.uid, f.brand_id, f.title, f.price, f.vendor, f.status,
-                               f.created_at, COUNT(DISTINCT li.id) as image_count
+                               f.created_at,
+                               (SELECT COUNT(*) FROM low_resol_images li WHERE li.uid = f.uid) AS images_count
                         FROM fashion f
-                        LEFT JOIN low_resol_images li ON f.uid = li.uid
                         WHERE {' AND '.join(where_clauses)}
-                        GROUP BY f.uid
                         ORDER BY f.created_at DESC
                         LIMIT %s OFFSET %s
                     """
                     params.extend([limit, offset])
                     await cursor.execute(query, tuple(params))
 
-                    results = await cursor.fetchall()
-                    return [
-                        {
-                            'uid': row['uid'],
-                            'brand_id': row['brand_id'],
-                            'title': row['title'],
-                            'price': row['price'],
-                            'vendor': row['vendor'],
-                            'status': row['status'],
-                            'created_at': row['created_at'],
-                            'images_count': row['image_count']
-                        }
-                        for row in results
-                    ]
+                    # DictCursor rows already carry the response keys
+                    return await cursor.fetchall()
 
                 except Exception as e:
-                    print(f'Error listing products: {str(e)}')
+                    logger.exception('Error listing products')
                     return []
 
 
@@ -9,6 +9,10 @@ from urllib.parse import urlencode
 import secrets
 import aiohttp
 from .. import shopify
+import logging
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 
@@ -33,7 +37,7 @@ async def list_stores():
         }), 200
 
     except Exception as e:
-        print(f"Error listing stores: {str(e)}")
+        logger.exception('error listing stores')
         return jsonify({
             'status': 'error',
             'message': f'Failed to list stores: {str(e)}'
@@ -64,7 +68,7 @@ async def delete_store(store_id):
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"Error deleting store: {str(e)}")
+        logger.exception('error deleting store')
         return jsonify({
             'status': 'error',
             'message': f'Failed to delete store: {str(e)}'
@@ -11,6 +11,9 @@ class ShopifyRetryableError(Exception):
 
 logger = logging.getLogger(__name__)
 
+# every client talks to *.myshopify.com, one session keeps those tls connections alive between calls
+shopify_session = requests.Session()
+
 
 
 class ShopifyGraphQLClient:
@@ -55,13 +58,13 @@ class ShopifyGraphQLClient:
                 rest_time_ms = throttle.get("restoreRate", 50)
                 # Convert ms to seconds, add buffer
                 sleep_time = (rest_time_ms / 1000) + 1
-                print(f"[Shopify Rate Limit] Available: {currently_available}/{max_available}")
-                print(f"[Shopify Rate Limit] Backing off for {sleep_time}s")
+                logger.info("[Shopify Rate Limit] Available: %s/%s", currently_available, max_available)
+                logger.warning("[Shopify Rate Limit] Backing off for %ss", sleep_time)
                 time.sleep(sleep_time)
                 return True
-        except Exception as e:
+        except Exception:
             # If we can't parse throttle info, continue anyway
-            print(f"Warning: Could not parse rate limit info: {str(e)}")
+            logger.warning("Could not parse rate limit info", exc_info=True)
         
         return False
 
@@ -102,7 +105,7 @@ class ShopifyGraphQLClient:
         # REST API endpoint
         rest_endpoint = f"https://{self.shop_name}.myshopify.com/admin/api/{self.api_version}/products.json"
 
-        response = requests.post(
+        response = shopify_session.post(
             rest_endpoint,
             json=product_data,
             headers={
@@ -173,7 +176,7 @@ class ShopifyGraphQLClient:
                 "value": alt_text
             }
         
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -195,6 +198,59 @@ class ShopifyGraphQLClient:
             "id": data["data"]["productCreateMedia"]["media"]["id"]
         }
 
+    def create_product_media_bulk(self, product_id: str, media_list: list) -> list:
+        """
+        Upload several images to a Shopify product in one productCreateMedia call.
+
+        Args:
+            product_id: Shopify product ID (gid://shopify/Product/xxx)
+            media_list: list of {"image_url", "alt_text"} dicts, already in display order
+
+        Returns:
+            List of media IDs in the same order as media_list
+        """
+        query = """
+        mutation productCreateMedia($productId: ID!, $media: [CreateMediaInput!]!) {
+          productCreateMedia(productId: $productId, media: $media) {
+            media {
+              id
+              alt
+            }
+            userErrors { field, message }
+          }
+        }
+        """
+
+        media = []
+        for item in media_list:
+            media_input = {
+                "mediaContentType": "IMAGE",
+                "originalSource": item.get("image_url")
+            }
+            if item.get("alt_text"):
+                media_input["alt"] = item["alt_text"]
+            media.append(media_input)
+
+        variables = {"productId": product_id, "media": media}
+        response = shopify_session.post(
+            self.endpoint,
+            json={"query": query, "variables": variables},
+            headers=self.headers,
+            timeout=30
+        )
+
+        response.raise_for_status()
+        data = response.json()
+        ShopifyGraphQLClient.handle_rate_limit(data)
+
+        errors = data["data"]["productCreateMedia"]["userErrors"]
+        if errors:
+            logger.error("Shopify productCreateMedia errors: %s", errors)
+            raise ShopifyAPIError(errors)
+
+        # media comes back in the order it was sent
+        return [item["id"] for item in data["data"]["productCreateMedia"]["media"]]
+
     def create_product(self, title: str, description: str, price: str) -> dict:
         """
         Simple product creation (legacy - for backwards compatibility).
@@ -226,7 +282,7 @@ class ShopifyGraphQLClient:
             }
         }
 
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={
                 "query": query,
@@ -258,7 +314,7 @@ class ShopifyGraphQLClient:
         """
 
         variables = {"input": {"id": product_id, **product_input}}
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -309,7 +365,7 @@ class ShopifyGraphQLClient:
         }
         """
         variables = {"productId": product_id, "mediaIds": media_ids}
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -335,7 +391,7 @@ class ShopifyGraphQLClient:
           }
         }
         """
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": {"first": 50}},
             headers=self.headers,
@@ -357,7 +413,7 @@ class ShopifyGraphQLClient:
           }
         }
         """
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": {"inventoryItemId": inventory_item_id, "locationId": location_id}},
             headers=self.headers,
@@ -396,7 +452,7 @@ class ShopifyGraphQLClient:
                 ]
             }
         }
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -422,7 +478,7 @@ class ShopifyGraphQLClient:
         }
         """
         variables = {"input": {"id": variant_id, **variant_input}}
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -448,7 +504,7 @@ class ShopifyGraphQLClient:
         }
         """
         variables = {"input": {"productId": product_id, **variant_input}}
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": variables},
             headers=self.headers,
@@ -479,7 +535,7 @@ class ShopifyGraphQLClient:
           }
         }
         """
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": {"id": variant_id}},
             headers=self.headers,
@@ -505,7 +561,7 @@ class ShopifyGraphQLClient:
           }
         }
         """
-        response = requests.post(
+        response = shopify_session.post(
             self.endpoint,
             json={"query": query, "variables": {"id": product_id}},
             headers=self.headers,
@@ -1,14 +1,48 @@
 import json
 import uuid
 import time
+import asyncio
 import requests
+import aiohttp
 from quart import current_app
 from asyncmy.cursors import DictCursor
 from channels.shopify.mariadb import Fetch, Write
 from shopify_archives.graphql import ShopifyRetryableError
 from channels.shopify.helper import get_store_config
+from utils.cache import TTLCache
+from platforms.shopify.mariadb import PRODUCT_UPDATE_FIELDS, product_update_query
 from shopify_archives.exceptions import AuthorizationError, ShopifyAPIError, ValidationError, IdempotencyConflict
 
+# HEAD requests are network bound, this many run at once while validating product images
+IMAGE_CHECK_CONNECTIONS = 16
+IMAGE_CHECK_TIMEOUT = aiohttp.ClientTimeout(total=5)
+# a reachable image stays reachable for hours, failures are retried sooner in case they were transient
+reachable_image_urls = TTLCache(ttl=3600, maxsize=100_000)
+unreachable_image_urls = TTLCache(ttl=300, maxsize=10_000)
+
+# replayed idempotency keys are answered from here before touching catalogue_idempotency
+idempotency_cache = TTLCache(ttl=600, maxsize=10_000)
+
+# statements used on every product write, kept as constants so the exact same text goes to the server each time
+IMAGE_INSERT_QUERY = '''INSERT INTO low_resol_images (uid, image_url, position) VALUES (%s, %s, %s)'''
+PRODUCT_MAPPING_INSERT_QUERY = '''INSERT INTO shopify_product_mapping (uid, brand_id, shopify_product_id, store_id, last_sync_status, synced_at) VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)'''
+CHANGE_STACK_INSERT_QUERY = '''INSERT INTO product_info_change_stack (uid, brand_id, user_id, action, changed_attribute, update_date, update_time) VALUES (%s, %s, %s, %s, %s, CURRENT_DATE, CURRENT_TIME)'''
+
+
+def split_tags(tags: str) -> list:
+    """Comma separated tags without blanks, "a, ,b," becomes ["a", "b"] (Shopify rejects empty tags)."""
+    return [tag for tag in (part.strip() for part in (tags or "").split(",")) if tag]
+
+
+# product mapping for a uid, only returned when the user has access to the product's brand
+OWNED_PRODUCT_MAPPING_QUERY = '''
+    SELECT spm.store_id, spm.shopify_product_id
+    FROM shopify_product_mapping spm
+    JOIN uid_record u ON spm.uid = u.uid
+    JOIN brand_access ba ON ba.brand_id = u.brand_id AND ba.user_id = %s
+    WHERE spm.uid = %s AND u.brand_id = %s
+'''
+
 
 class ProductService:
     """Service for managing products (brand-centric) with Shopify sync and strict isolation."""
@@ -45,17 +79,18 @@ class ProductService:
             raise IdempotencyConflict(json.dumps(existing))
 
         # Validate images
-        invalid_images = ProductService.validate_image_urls(images)
+        invalid_images = await ProductService.validate_image_urls(images)
         if invalid_images:
             raise ValidationError(json.dumps({"images": invalid_images}))
 
-        # Build Shopify product input
+        # Build Shopify product input, the cleaned tags are stored locally as well
+        tags_list = split_tags(tags)
         product_input = {
             "title": title,
             "descriptionHtml": description,
             "vendor": vendor,
             "productType": product_type,
-            "tags": tags.split(",") if tags else [],
+            "tags": tags_list,
         }
         if variants:
             product_input["variants"] = [
@@ -78,25 +113,24 @@ class ProductService:
             lambda: shopify_client.create_product_with_variants(product_input)
         )
 
-        # Upload images
+        # Upload images, sent already sorted in one call so no reorder is needed afterwards
         shopify_images = []
         if images:
-            for img in images:
-                media = ProductService._retry_shopify_call(
-                    lambda: shopify_client.create_product_media(
-                        product_id=shopify_product["id"],
-                        image_url=img.get("image_url")
-                    ))
-                shopify_images.append({
-                    "shopify_media_id": media["id"],
-                    "position": img.get("position", len(shopify_images)),
-                    "image_url": img.get("image_url")
-                })
-        if shopify_images:
-            media_ids = [img["shopify_media_id"] for img in sorted(shopify_images, key=lambda x: x["position"])]
-            ProductService._retry_shopify_call(
-                lambda: shopify_client.reorder_product_media(shopify_product["id"], media_ids)
+            ordered_images = sorted(
+                ({**img, "position": img.get("position", index)} for index, img in enumerate(images)),
+                key=lambda x: x["position"]
+            )
+            media_ids = ProductService._retry_shopify_call(
+                lambda: shopify_client.create_product_media_bulk(shopify_product["id"], ordered_images)
             )
+            shopify_images = [
+                {
+                    "shopify_media_id": media_id,
+                    "position": img["position"],
+                    "image_url": img.get("image_url")
+                }
+                for media_id, img in zip(media_ids, ordered_images)
+            ]
 
         # Persist locally
         uid = str(uuid.uuid4())
@@ -107,7 +141,7 @@ class ProductService:
             description=description,
             vendor=vendor,
             product_type=product_type,
-            tags=tags,
+            tags=",".join(tags_list),
             status="ACTIVE",
             price=variants[0].get("price") if variants else 0,
             compare_at_price=variants[0].get("compare_at_price") if variants else None,
@@ -121,22 +155,25 @@ class ProductService:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
-                    for img_data in shopify_images:
-                        await cursor.execute(
-                            '''INSERT INTO low_resol_images (uid, image_url, position) VALUES (%s, %s, %s)''',
-                            (uid, img_data["image_url"], img_data["position"])
+                    # images, mapping and audit row land in one transaction with a single commit
+                    await conn.begin()
+
+                    # executemany is rewritten into one multi row INSERT, so all images take a single round trip
+                    if shopify_images:
+                        await cursor.executemany(
+                            IMAGE_INSERT_QUERY,
+                            [(uid, img_data["image_url"], img_data["position"]) for img_data in shopify_images]
                         )
 
                     # Insert Shopify mapping including brand_id and synced_at
                     await cursor.execute(
-                        '''INSERT INTO shopify_product_mapping (uid, brand_id, shopify_product_id, store_id, last_sync_status, synced_at) VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)''',
+                        PRODUCT_MAPPING_INSERT_QUERY,
                         (uid, brand_id, shopify_product["id"], store_id, "SUCCESS")
                     )
-                    await conn.commit()
 
                     # Record change stack
                     await cursor.execute(
-                        '''INSERT INTO product_info_change_stack (uid, brand_id, user_id, action, changed_attribute, update_date, update_time) VALUES (%s, %s, %s, %s, %s, CURRENT_DATE, CURRENT_TIME)''',
+                        CHANGE_STACK_INSERT_QUERY,
                         (uid, brand_id, user_id, "CREATE", json.dumps({
                             "shopify_product_id": shopify_product["id"],
                             "images_count": len(shopify_images)
@@ -159,22 +196,51 @@ class ProductService:
                     raise
 
     @staticmethod
-    def validate_image_urls(images: list) -> list:
-        """Validate image URLs by issuing HEAD requests."""
+    async def validate_image_urls(images: list) -> list:
+        """Validate image URLs by issuing HEAD requests concurrently, results keep the input order."""
+        urls = [(img or {}).get("image_url") for img in images or []]
+
+        # each distinct url is looked up once, swatches often repeat the same image
+        # recently checked urls are answered from the caches, TTLCache.MISSING marks the ones still to check
+        results = {}
+        for url in urls:
+            if url and url not in results:
+                results[url] = None if reachable_image_urls.get(url, False) else unreachable_image_urls.get(url)
+
+        pending = [url for url, result in results.items() if result is TTLCache.MISSING]
+        if pending:
+            # the app wide session keeps connections alive between calls, the semaphore bounds open HEAD requests
+            limit = asyncio.Semaphore(IMAGE_CHECK_CONNECTIONS)
+            checked = await asyncio.gather(
+                *(ProductService._check_image_url(current_app.http_session, url, limit) for url in pending))
+            for url, result in zip(pending, checked):
+                results[url] = result
+                if result is None:
+                    reachable_image_urls.set(url, True)
+                else:
+                    unreachable_image_urls.set(url, result)
+
+        # expanded back to the input order, a repeated bad url is reported for every image using it
         invalid = []
-        for img in images or []:
-            url = (img or {}).get("image_url")
-            if not url:
-                invalid.append({"image_url": None, "reason": "missing"})
-                continue
-            try:
-                response = requests.head(url, timeout=5, allow_redirects=True)
-                if response.status_code >= 400:
-                    invalid.append({"image_url": url, "reason": f"status_{response.status_code}"})
-            except Exception:
-                invalid.append({"image_url": url, "reason": "unreachable"})
+        for url in urls:
+            result = results[url] if url else {"image_url": None, "reason": "missing"}
+            if result is not None:
+                invalid.append(result)
         return invalid
 
+    @staticmethod
+    async def _check_image_url(http_session: aiohttp.ClientSession, url: str, limit: asyncio.Semaphore) -> dict:
+        """HEAD one image url, returns the invalid entry or None when the url is reachable."""
+        if not url:
+            return {"image_url": None, "reason": "missing"}
+        try:
+            async with limit, http_session.head(url, allow_redirects=True, timeout=IMAGE_CHECK_TIMEOUT) as response:
+                if response.status >= 400:
+                    return {"image_url": url, "reason": f"status_{response.status}"}
+        except Exception:
+            return {"image_url": url, "reason": "unreachable"}
+        return None
+
     @staticmethod
     def _retry_shopify_call(callable_fn, attempts: int = 3, backoff_seconds: float = 2.0):
         """Basic retry for Shopify calls on transient errors."""
@@ -197,6 +263,11 @@ class ProductService:
         """
         if not idempotency_key:
             return None
+        cache_key = (idempotency_key, user_id, brand_id)
+        cached = idempotency_cache.get(cache_key)
+        if cached is not idempotency_cache.MISSING:
+            return cached
+
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
@@ -204,12 +275,15 @@ class ProductService:
                     '''
                     SELECT response_json FROM catalogue_idempotency
                     WHERE idempotency_key = %s AND user_id = %s AND brand_id = %s
+                        AND created_at >= NOW() - INTERVAL 24 HOUR
                     ''',
                     (idempotency_key, user_id, brand_id)
                 )
                 result = await cursor.fetchone()
                 if result:
-                    return json.loads(result['response_json'])
+                    response = json.loads(result['response_json'])
+                    idempotency_cache.set(cache_key, response)
+                    return response
                 return None
 
     @staticmethod
@@ -229,6 +303,7 @@ class ProductService:
                         (idempotency_key, user_id, brand_id, json.dumps(response_payload))
                     )
                     await conn.commit()
+                    idempotency_cache.set((idempotency_key, user_id, brand_id), response_payload)
                 except Exception:
                     await conn.rollback()
 
@@ -239,16 +314,11 @@ class ProductService:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
-                    await ProductService.verify_brand_ownership(brand_id, user_id)
-
-                    # Ensure product belongs to brand via uid_record join
-                    await cursor.execute(
-                        '''SELECT spm.store_id, spm.shopify_product_id FROM shopify_product_mapping spm JOIN uid_record u ON spm.uid = u.uid WHERE spm.uid = %s AND u.brand_id = %s''',
-                        (uid, brand_id)
-                    )
+                    # ownership and mapping in one round trip, no row means either is missing
+                    await cursor.execute(OWNED_PRODUCT_MAPPING_QUERY, (user_id, uid, brand_id))
                     row = await cursor.fetchone()
                     if not row:
-                        return {"status": "error", "message": "Product mapping not found"}
+                        return {"status": "error", "message": "Product mapping not found or access denied"}
                     store_id, shopify_product_id = row['store_id'], row['shopify_product_id']
                     store_config = await get_store_config(store_id, user_id)
                     shopify_client = store_config["client"]
@@ -263,29 +333,26 @@ class ProductService:
                     ]:
                         if field in payload and payload[field] is not None:
                             if field == "tags":
-                                product_input[key] = payload[field].split(",") if payload[field] else []
+                                product_input[key] = split_tags(payload[field])
                             else:
                                 product_input[key] = payload[field]
                     if product_input:
                         shopify_client.update_product(shopify_product_id, product_input)
 
                     # Update local DB WITH brand isolation by joining uid_record
-                    updates = []
-                    params = []
-                    allowed_fields = ["title", "description", "vendor", "product_type", "tags", "status", "price", "compare_at_price", "sku", "barcode", "weight", "weight_unit", "collections", "brand_color", "product_remark", "series_length_ankle", "series_rise_waist", "series_knee", "gender", "fit_type", "print_type", "material", "material_composition", "care_instruction", "art_technique", "stitch_type"]
-                    for key in allowed_fields:
-                        if key in payload:
-                            updates.append(f'{key} = %s')
-                            params.append(payload[key])
+                    updates = tuple(key for key in PRODUCT_UPDATE_FIELDS if key in payload)
 
                     if updates:
+                        params = [",".join(split_tags(payload[key])) if key == "tags" and payload[key] else payload[key]
+                                  for key in updates]
                         params.extend([uid, brand_id])
-                        await cursor.execute(f"UPDATE fashion SET {', '.join(updates)} WHERE uid = %s AND brand_id = %s", params)
-                        await conn.commit()
+                        # the update and its audit row commit together
+                        await conn.begin()
+                        await cursor.execute(product_update_query(updates), params)
 
                         # Audit/stack insert with changed_attribute JSON and timestamps
                         await cursor.execute(
-                            '''INSERT INTO product_info_change_stack (uid, brand_id, user_id, action, changed_attribute, update_date, update_time) VALUES (%s, %s, %s, %s, %s, CURRENT_DATE, CURRENT_TIME)''',
+                            CHANGE_STACK_INSERT_QUERY,
                             (uid, brand_id, user_id, "UPDATE", json.dumps(payload))
                         )
                         await conn.commit()
@@ -302,18 +369,17 @@ class ProductService:
         async with pool.acquire() as conn:
             async with conn.cursor(cursor=DictCursor) as cursor:
                 try:
-                    await ProductService.verify_brand_ownership(brand_id, user_id)
-                    await cursor.execute(
-                        '''SELECT spm.store_id, spm.shopify_product_id FROM shopify_product_mapping spm JOIN uid_record u ON spm.uid = u.uid WHERE spm.uid = %s AND u.brand_id = %s''',
-                        (uid, brand_id)
-                    )
+                    # ownership and mapping in one round trip, no row means either is missing
+                    await cursor.execute(OWNED_PRODUCT_MAPPING_QUERY, (user_id, uid, brand_id))
                     row = await cursor.fetchone()
                     if not row:
-                        return {"status": "error", "message": "Product mapping not found"}
+                        return {"status": "error", "message": "Product mapping not found or access denied"}
                     store_id, shopify_product_id = row['store_id'], row['shopify_product_id']
                     store_config = await get_store_config(store_id, user_id)
                     shopify_client = store_config["client"]
                     shopify_client.delete_product(shopify_product_id)
+                    # the delete and its audit row commit together
+                    await conn.begin()
                     if soft_delete:
                         await cursor.execute(
                             '''UPDATE fashion SET status = 'ARCHIVED' WHERE uid = %s AND brand_id = %s''',
@@ -324,9 +390,8 @@ class ProductService:
                             '''DELETE f FROM fashion f JOIN uid_record u ON f.uid = u.uid WHERE f.uid = %s AND u.brand_id = %s''',
                             (uid, brand_id)
                         )
-                    await conn.commit()
                     await cursor.execute(
-                        '''INSERT INTO product_info_change_stack (uid, brand_id, user_id, action, changed_attribute, update_date, update_time) VALUES (%s, %s, %s, %s, %s, CURRENT_DATE, CURRENT_TIME)''',
+                        CHANGE_STACK_INSERT_QUERY,
                         (uid, brand_id, user_id, "DELETE", json.dumps({"soft_delete": soft_delete}))
                     )
                     await conn.commit()
@@ -415,32 +480,19 @@ class ProductService:
 
                     query = f'''
                         SELECT f.uid, u.brand_id, f.title, f.price, f.vendor, f.status,
-                               f.created_at, COUNT(DISTINCT li.id) as image_count
+                               f.created_at,
+                               (SELECT COUNT(*) FROM low_resol_images li WHERE li.uid = f.uid) AS images_count
                         FROM fashion f
                         JOIN uid_record u ON f.uid = u.uid
-                        LEFT JOIN low_resol_images li ON f.uid = li.uid
                         WHERE {' AND '.join(where_clauses)}
-                        GROUP BY f.uid
                         ORDER BY f.created_at DESC
                         LIMIT %s OFFSET %s
                     '''
                     params.extend([limit, offset])
                     await cursor.execute(query, tuple(params))
 
-                    results = await cursor.fetchall()
-                    return [
-                        {
-                            'uid': row['uid'],
-                            'brand_id': row['brand_id'],
-                            'title': row['title'],
-                            'price': row['price'],
-                            'vendor': row['vendor'],
-                            'status': row['status'],
-                            'created_at': row['created_at'],
-                            'images_count': row['image_count']
-                        }
-                        for row in results
-                    ]
+                    # DictCursor rows already carry the response keys
+                    return await cursor.fetchall()
 
                 except Exception:
                     return []
@@ -1,10 +1,25 @@
-from quart import current_app
+from quart import current_app, g
 from datetime import datetime
 from asyncmy.cursors import DictCursor
+import logging
+import hmac
+
+logger = logging.getLogger(__name__)
+
+# signup responses are never mutated by the callers, so they are shared
+SIGNUP_OK = {'status': 'ok', 'message': 'user_registration_successful'}
+SIGNUP_DUPLICATE = {'status': 'error', 'message': 'user_already_registered'}
+SIGNUP_FAILED = {'status': 'error', 'message': 'unable_to_register_user'}
+
 
 class Write:
     @staticmethod
     async def signup_user(user_creds):
+        '''
+            duplicate emails are rejected by the unique index on user_creds.user_email (migration 003),
+            the 1062 error becomes SIGNUP_DUPLICATE. do not add a select-before-insert check here,
+            it costs a round trip and still races with a concurrent signup
+        '''
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor() as cursor:
@@ -16,6 +31,8 @@ class Write:
                     email = user_creds.get('email')
                     designation = user_creds.get('designation')
 
+                    # the pool runs in autocommit, both rows must land together
+                    await conn.begin()
                     await cursor.execute(
                         '''
                         INSERT INTO users(user_id, user_password)
@@ -44,65 +61,114 @@ class Write:
 
                 except Exception as e:
                     await conn.rollback()
-                    print(f'Error encountered while signing up user: {e}')
-
-                    if hasattr(e, "args") and e.args and e.args[0] == 1062:
-                        return {
-                            'status': 'error',
-                            'message': 'user_already_registered'
-                        }
-
-                    return {
-                        'status': 'error',
-                        'message': 'unable_to_register_user'
-                    }
-
-        return {
-            'status': 'ok',
-            'message': 'user_registration_successful'
-        }
+
+                    if e.args and e.args[0] == 1062:
+                        return SIGNUP_DUPLICATE
+
+                    logger.error('Error encountered while signing up user', exc_info=True)
+                    return SIGNUP_FAILED
+
+        return SIGNUP_OK
+
+    @staticmethod
+    async def delete_user(userid):
+        '''removes a user that signup_user just created, used when the write that needed the user fails'''
+        pool = current_app.pool
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await conn.begin()
+                    await cursor.execute('DELETE FROM user_creds WHERE user_id = %s', (userid,))
+                    await cursor.execute('DELETE FROM users WHERE user_id = %s', (userid,))
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    logger.exception('error occurred while removing the user %s', userid)
+                    return 'failed'
+        return 'ok'
 class Fetch:
     @staticmethod
     async def userid_by_email(email):
         pool = current_app.pool
         async with pool.acquire() as conn:
-            async with conn.cursor(cursor=DictCursor) as cursor:
+            # plain tuple cursor, only a single column comes back
+            async with conn.cursor() as cursor:
                 userid = None
                 try:          
                     await cursor.execute('''
                                    select user_id from user_creds where user_email=%s
                                    ''', (email, ))
-                    userid = await cursor.fetchone()
-                    userid = userid.get('user_id')
-                    # userid = userid[0] if userid and len(userid) != 0 else None
-                except Exception as e:
-                    print(f"error while checking the checking the credentials for login as\n{e}")
+                    result = await cursor.fetchone()
+                    if result:
+                        userid = result[0]
+                except Exception:
+                    logger.exception('error while checking the credentials for login')
                 return userid
             
+    @staticmethod
+    async def login(email, hashed_password):
+        '''
+        resolves the user and checks the password in a single query
+        returns {'user_id': ..., 'valid': True/False} or None when no user has this email
+        '''
+        pool = current_app.pool
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(
+                        '''
+                        SELECT uc.user_id, u.user_password
+                        FROM user_creds uc
+                        JOIN users u ON u.user_id = uc.user_id
+                        WHERE uc.user_email=%s
+                        LIMIT 1
+                        ''',
+                        (email, )
+                    )
+                    result = await cursor.fetchone()
+                    if result is None:
+                        return None
+                    user_id, user_password = result
+                    # constant time comparison, the hash never goes out in the query
+                    valid = hmac.compare_digest(user_password.encode(), hashed_password.encode())
+                    return {'user_id': user_id, 'valid': valid}
+                except Exception:
+                    logger.exception('error occurred while checking the login credentials')
+                    return None
+
     @staticmethod
     async def check_password(userid, hashed_password):
         pool = current_app.pool
         async with pool.acquire() as conn:
-            async with conn.cursor(DictCursor) as cursor:
+            async with conn.cursor() as cursor:
                 try:
                     await cursor.execute(
                         '''
-                        SELECT 1 AS valid
+                        SELECT user_password
                         FROM users
-                        WHERE user_id=%s AND user_password=%s
+                        WHERE user_id=%s
                         ''',
-                        (userid, hashed_password)
+                        (userid, )
                     )
                     result = await cursor.fetchone()
-                    return 'valid' if result.get('valid') else 'invalid'
-                except Exception as e:
-                    print(f'error occurred while checking the password as {e}')
+                    if result is None:
+                        return 'invalid'
+                    valid = hmac.compare_digest(result[0].encode(), hashed_password.encode())
+                    return 'valid' if valid else 'invalid'
+                except Exception:
+                    logger.exception('error occurred while checking the password')
                     return None
     
     @staticmethod
     async def user_details(userid):
         if userid is None:
             return ()
+
+        # repeated lookups within the same request are served from g
+        cached = getattr(g, '_user_details', None)
+        if cached and cached[0] == userid:
+            return cached[1]
+
         pool = current_app.pool
         async with pool.acquire() as conn:
             async with conn.cursor(DictCursor) as cursor:
@@ -119,16 +185,23 @@ class Fetch:
                         ''',
                         (userid,)
                     )
-                    return await cursor.fetchone()
-                except Exception as e:
-                    print(f'encountered error while fetching user credentials\n{e}')
+                    details = await cursor.fetchone()
+                    g._user_details = (userid, details)
+                    return details
+                except Exception:
+                    logger.exception('encountered error while fetching user credentials')
                     return None
                 
     @staticmethod
     async def user_access(user_id):
+        # repeated access checks within the same request are served from g
+        cached = getattr(g, '_user_access', None)
+        if cached and cached[0] == user_id:
+            return cached[1]
+
         pool = current_app.pool
         async with pool.acquire() as conn:
-            async with conn.cursor(DictCursor) as cursor:
+            async with conn.cursor() as cursor:
                 try:
                     await cursor.execute(
                         '''
@@ -139,7 +212,9 @@ class Fetch:
                         (user_id,)
                     )
                     result = await cursor.fetchone()
-                    return result["user_access"] if result else None
-                except Exception as e:
-                    print(f'error encountered while fetching the user access\n{e}')
+                    access = result[0] if result else None
+                    g._user_access = (user_id, access)
+                    return access
+                except Exception:
+                    logger.exception('error encountered while fetching the user access')
                     return None
\ No newline at end of file
@@ -3,9 +3,15 @@ from user.repository import mariadb
 from utils.helper import Validate, User, Helper
 from utils.prerequirements import login_required
 from brand.routes import connect_brand
+import logging
+
+logger = logging.getLogger(__name__)
 
 user = Blueprint('user', __name__)
 
+# extra fields in the signup payload are ignored, only these have to be present
+SIGNUP_REQUIRED_KEYS = frozenset(('number', 'email', 'password'))
+
 @user.route('/signup', methods=['POST'])
 async def signup():
     data = await request.get_json()
@@ -17,8 +23,11 @@ async def signup():
     
     if designation == None:
         designation = 'Owner'
+    # normalized before validation, same as login, so the validated form is the stored one
+    if email:
+        email = User.normalize_email(email)
     # verify number and email
-    if number and email and password and designation and Validate.email(email) and Validate.in_phone_num(number):
+    if SIGNUP_REQUIRED_KEYS <= data.keys() and number and email and password and Validate.email(email) and Validate.in_phone_num(number):
         # verify number and email
         user_creds = {
             'name': name,
@@ -34,7 +43,7 @@ async def signup():
         if response and response.get('status') != 'ok':
             if response.get('message') == 'user_already_registered':
                 return jsonify({'status': 'already_registered'}), 409
-        print('registered the user')
+        logger.info('registered user %s', user_creds['userid'])
     else:
         return jsonify({'status': 'Bad Request', 'message': 'all required field not provided'}), 400
     
@@ -54,18 +63,18 @@ async def login():
     if not email or not password:
         return jsonify({'status': 'invalid request', 'message': 'email or password not provided'}), 400
 
+    email = User.normalize_email(email)
     if Validate.email(email):
-        userid = await mariadb.Fetch.userid_by_email(email)
+        hashed_password = User.hash_password(password)
+        login_check = await mariadb.Fetch.login(email, hashed_password)
 
-        # if the userid is null then return then do not log in
-        if userid == None:
+        # if no user is found then do not log in
+        if login_check == None:
             return jsonify({'status': 'error', 'message': 'user not found with this email'}), 401
-        hashed_password = User.hash_password(password)
-        login_check = await mariadb.Fetch.check_password(userid, hashed_password)
 
-        if login_check == 'valid':
+        if login_check.get('valid'):
             session.clear()
-            session['user'] = userid
+            session['user'] = login_check.get('user_id')
             session.permanent = False
             # print(session.get('user'))
             
@@ -109,7 +118,7 @@ async def fetch_user_creds():
         return jsonify({'status': 'unauthorised access', 'message': 'no loged in user found'}), 401
     _ = await mariadb.Fetch.user_details(user)
 
-    print(_)
+    logger.debug('user details %s', _)
     user_data = {
                 'name': _.get('user_name'),
                 'number': _.get('phone_number'),
@@ -0,0 +1,43 @@
+"""
+Small in-process TTL cache for read-mostly lookups.
+Entries live per worker process, so keep the ttl short and invalidate on writes.
+"""
+
+from collections import OrderedDict
+import time
+
+
+class TTLCache:
+    """Key/value store whose entries expire after `ttl` seconds (LRU-bounded by maxsize)."""
+
+    MISSING = object()
+
+    def __init__(self, ttl: float = 60, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=MISSING):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
@@ -4,7 +4,15 @@ Uses Fernet (AES-128 + HMAC) for secure encryption.
 """
 
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import base64
 import os
+import threading
+
+# the PBKDF2 derivation below is deliberately slow, so the cipher is built once per process
+_cipher = None
+_cipher_lock = threading.Lock()
 
 
 class TokenEncryption:
@@ -13,22 +21,30 @@ class TokenEncryption:
     @staticmethod
     def get_cipher():
         """Get Fernet cipher using app secret key."""
+        global _cipher
+        if _cipher is not None:
+            return _cipher
+
+        with _cipher_lock:
+            # another thread may have derived it while we waited
+            if _cipher is None:
+                _cipher = TokenEncryption._derive_cipher()
+        return _cipher
+
+    @staticmethod
+    def _derive_cipher():
+        """Derive the Fernet key from the app secret (PBKDF2, run once per process)."""
         # Generate key from environment variable
         secret = os.environ.get('HOOTER_SECRET_KEY', 'default-key')
         # Fernet requires a 32-byte base64 key
         # We'll derive it from the secret
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-        from cryptography.hazmat.backends import default_backend
-        import base64
 
         # Use PBKDF2 to derive a proper key
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=b'H0oter_encyption_salt@farhanAhmad@lead-dev',  # Fixed salt for consistency
-            iterations=100000,
-            backend=default_backend()
+            iterations=100000
         )
         key = base64.urlsafe_b64encode(kdf.derive(secret.encode()))
         return Fernet(key)
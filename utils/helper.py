@@ -1,8 +1,19 @@
-import uuid
+import secrets
 import datetime
 import re
 import hashlib
 import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# compiled once, validation runs on every signup and login
+# every separator is followed by at least one character, so each input has only one way to match (no backtracking blowup)
+EMAIL_REGEX = re.compile(r'^[A-Za-z0-9]+(?:[._%+-][A-Za-z0-9]+)*@[A-Za-z0-9-]+(?:\.[A-Za-z]{2,})+$')
+PHONE_REGEX = re.compile(r'^\d{10}$')
+# drops the separators people type inside phone numbers in one pass
+PHONE_SEPARATORS = str.maketrans('', '', ' -')
 
 class User:
     
@@ -10,11 +21,15 @@ class User:
     def create_userid() -> str:
         # create hooter user ids-
         prefix = 'user_'
-        unique_id = str(uuid.uuid4())[:18]
-        date = str(datetime.datetime.now().date()).replace('-', '')
-        userid = prefix+unique_id+date
+        unique_id = secrets.token_hex(9)
+        userid = prefix+unique_id+current_clock()[3]
         return userid
     
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        # emails are stored and looked up in this form so the index and the caches see one key per user
+        return email.strip().lower()
+
     @staticmethod
     def hash_password(password):
         encoded_password = password.encode()
@@ -28,46 +43,49 @@ class Validate:
 
     @staticmethod
     def email(mail):
-        mail_id = mail
-        regex_expression = r'^[A-Za-z0-9]+([._%+-]?[A-Za-z0-9]+)*@[A-Za-z0-9-]+(\.[A-Za-z]{2,})+$'
-        if re.match(regex_expression, mail_id):
-            return True
-        else: 
-            return False
+        return EMAIL_REGEX.match(mail) is not None
         
     @staticmethod
     def in_phone_num(number):
-        phone_number = str(number)
-        phone_number = phone_number.lstrip('+91')
-        phone_number = phone_number.replace('-', '')
+        # removing the whitespace and dashes in case the number is something like +91 xxxxx-xxxxx
+        phone_number = str(number).translate(PHONE_SEPARATORS)
+        # only the +91 country code is dropped, lstrip('+91') used to eat leading 9s and 1s of the number too
+        phone_number = phone_number.removeprefix('+91')
+        return PHONE_REGEX.match(phone_number) is not None
 
-        regex = r'^\d{10}$'
-        if re.match(regex, phone_number.strip()):  #checking the phonenumber by removing the whitespace in case
-            return True                             #the number is something like +91 xxxxxxxxxx
-        else:
-            return False
+
+# (epoch second, date string, time string, compact date for ids) of the last formatted clock reading
+_clock = (None, '', '', '')
+
+def current_clock():
+    '''formats the date and time at most once per second, requests in the same second reuse it'''
+    global _clock
+    second = int(time.time())
+    if _clock[0] != second:
+        now = datetime.datetime.fromtimestamp(second)
+        _clock = (second, str(now.date()), now.strftime('%H:%M:%S'), now.strftime('%Y%m%d'))
+    return _clock
 
 
 # creating additional package of almost repeatative tasks
 class Helper:
     @staticmethod
     def date():
-        date = str(datetime.datetime.now().date())
-        return date
+        return current_clock()[1]
 
     @staticmethod
     def time():
-        time = str(datetime.datetime.now().strftime('%H:%M:%S'))
-        return time
+        return current_clock()[2]
     
     # if you want to check if the current payload is valid or not
     # create a list of expected payloads
     # and pass the json response payload of the request here
+    # pass frozensets, module level ones for fixed payloads so they are built once
     @staticmethod
-    def check_required_payload(payload: dict, accepted_keys: list, necessary_keys: list):
+    def check_required_payload(payload: dict, accepted_keys: frozenset, necessary_keys: frozenset):
         return (
-            all(key in accepted_keys for key in payload) and 
-            all(key in payload and payload[key] is not None for key in necessary_keys)
+            payload.keys() <= accepted_keys and
+            all(payload.get(key) is not None for key in necessary_keys)
         )
 
 class Brand:
@@ -75,33 +93,39 @@ class Brand:
     def create_id() -> str:
         prefix = 'brand_'
 
-        unique_id = str(uuid.uuid4())[:14]
-        date = str(datetime.datetime.now().date()).replace('-', '')
-        id = prefix+unique_id+date
+        unique_id = secrets.token_hex(7)
+        id = prefix+unique_id+current_clock()[3]
         return id
     
+    # both json files are fixed for the life of the process, they are read once and kept here
+    _niches = None
+    _access_specifiers = None
+
     @staticmethod
-    def fetch_niches() -> list:
+    def fetch_niches() -> tuple:
+        if Brand._niches is not None:
+            return Brand._niches
         try:
             with open('./niche.json', 'r')as file:
                 read = json.load(file)
-            return (list(read.get('niche')[0].keys()))
+            Brand._niches = tuple(read.get('niche')[0].keys())
+            return Brand._niches
         except Exception as e:
-            print(f"error while reading the niche.json file as \n{e}")
-            return list()
+            logger.exception('error while reading the niche.json file')
+            return tuple()
 
     @staticmethod
     async def access_specifiers():
         #access specifiers
-        user_access_specifiers=None
-        access_specifier=None
+        if Brand._access_specifiers is not None:
+            return Brand._access_specifiers
         try:
             with open('./access_specifiers.json', 'r') as file:
                 user_access_specifiers = json.load(file)
-            access_specifier = user_access_specifiers.get('access')
+            Brand._access_specifiers = tuple(user_access_specifiers.get('access'))
         except Exception as e:
-            print(f'error encountered as\n{e}')
-        return access_specifier
+            logger.exception('error while reading the access_specifiers.json file')
+        return Brand._access_specifiers
 
 
 
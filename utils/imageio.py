@@ -2,6 +2,9 @@ from utils import image_compression
 import asyncio
 import aiofiles
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 async def write(image: bytes, file_name, bufer_size):
     try:
@@ -18,7 +21,7 @@ async def write(image: bytes, file_name, bufer_size):
         asyncio.create_task(write_webp_card(image, webp_extension_file, bufer_size))
         return "ok"
     except Exception as e:
-        print("could not write the images into the files\n{e}")
+        logger.exception('could not write the images into the files')
         return "error"
     
 
@@ -77,7 +80,7 @@ async def read_image_card(file_name: str, buffer_size:int):
                     break
                 yield buffer
     except Exception as e:
-        print(f"could not read the image\n{e}")
+        logger.exception('could not read the image')
         return
     
 
@@ -86,11 +89,11 @@ async def delete_image(file_path: str):
     try:
         if os.path.exists(file_path):
             os.remove(file_path)
-            print(f"File {file_path} deleted successfully.")
+            logger.debug('file %s deleted', file_path)
             "ok"
         else:
-            print(f"The file {file_path} does not exist.")
+            logger.debug('file %s does not exist', file_path)
             "finished"
     except Exception as e:
-        print(f"could not read the image\n{e}")
+        logger.exception('could not delete the image')
         return "error"
\ No newline at end of file
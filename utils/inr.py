@@ -1,4 +1,8 @@
 #converting value into inr form
+import logging
+
+logger = logging.getLogger(__name__)
+
 class inr:
     def __init__(self, price: int =0) -> str:
         self.price = str(price)
@@ -29,7 +33,7 @@ class inr:
             # print(self.val)
             return '₹'+self.val+'.'+self.decimal
         except Exception as e:
-            print(f'exception encountered as \n{e}')
+            logger.exception('could not format the price')
             return self.price
     
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+"""
+orjson backed JSON provider for the Quart app.
+jsonify/request.get_json go through app.json, so every response and payload uses orjson.
+"""
+
+from quart.json.provider import DefaultJSONProvider
+import orjson
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Same output as the default provider (sorted keys, http dates), encoded by orjson."""
+
+    # datetimes are handed to self.default so they keep the http date format of the default provider
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        # callers passing json.dumps options (the session serializer, indent/separators...) get the stdlib path
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        # object_hook and friends are stdlib only, the tagged session serializer depends on them
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify always passes indent/separators to dumps, so it is encoded here to stay on orjson
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options) + b"\n", mimetype=self.mimetype
+        )
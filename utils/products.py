@@ -2,13 +2,17 @@ from uuid import uuid4
 from datetime import datetime
 from catalog.repository import mariadb
 
-async def create_usku():
+def build_usku(usku_count):
+    '''same id as create_usku for a count the caller already has, bulk uploads fetch the count once'''
     prefix = "Usku"
     unique_char = str(uuid4())[:9]
     unique_int = str(int(uuid4()))[:8]
-    usku_count = await mariadb.Fetch.count_catalogs()
     usku_count = str(usku_count)
     usku_id = prefix+unique_char+unique_int+str(datetime.now().date())+usku_count
     return usku_id
 
-# print(create_usku())
\ No newline at end of file
+async def create_usku():
+    usku_count = await mariadb.Fetch.count_catalogs()
+    return build_usku(usku_count)
+
+# print(create_usku())
@@ -19,12 +19,10 @@ def create_xlsx(header: list, mandatory_fields: list):
     ''' adding (*) to the imported keys'''
     for index, key in enumerate(header):
         if key in mandatory_fields:
-            print(key+"*")
             formated_header.append(snake_to_text(key+'*'))
         else:
             formated_header.append(snake_to_text(key))
 
-    print(formated_header)
     ws.append(formated_header)
 
     font = Font(size=14, bold=True, color='FFFFFFFF')
@@ -89,5 +87,17 @@ def remove_row(file: Workbook, index: int):
     buffer.seek(0)
     return buffer
 
+def remove_rows(file: Workbook, indexes: list):
+    wb = load_workbook(file)
+    ws = wb.active
+
+    '''deleting from the bottom so the indexes of the remaining rows do not shift'''
+    for index in sorted(indexes, reverse=True):
+        ws.delete_rows(index)
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
 if __name__ == "__main__":
     asyncio.to_thread(create_xlsx(["col1", "last_visit"]))